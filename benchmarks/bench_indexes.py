@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'flask'))
+
+from db_pool import create_pool_engine
+from migrate import MIGRATIONS_DIR, migration_files, split_statements
+
+BENCH_SCHEMA = 'bench_indexes'
+INDEX_MIGRATION = '0002_recommendation_indexes'
+
+POPULATE_PRODUCTS_QUERY = """
+INSERT INTO products (
+    product_id, product_name, category, discounted_price, actual_price,
+    discount_percentage, rating, rating_count, about_product, product_link, category_id
+)
+SELECT
+    'B' || lpad(g::text, 9, '0'),
+    'Synthetic product ' || g,
+    'Category ' || category_id,
+    round((price * (1 - discount / 100))::numeric, 2),
+    price,
+    discount,
+    round((1 + random() * 4)::numeric, 1),
+    (random() * 20000)::int,
+    repeat('Synthetic product description. ', 20),
+    'https://www.amazon.com/dp/B' || lpad(g::text, 9, '0'),
+    category_id
+FROM (
+    SELECT
+        g,
+        1 + (g %% %(categories)s) AS category_id,
+        round((5 + random() * 995)::numeric, 2)::float AS price,
+        CASE WHEN random() < %(discounted_share)s THEN round((1 + random() * 69)::numeric, 1)::float ELSE 0 END AS discount
+    FROM generate_series(1, %(products)s) AS g
+) AS synthetic
+"""
+
+POPULATE_USERS_QUERY = """
+INSERT INTO categories (id, name)
+SELECT c, 'Category ' || c FROM generate_series(1, %(categories)s) AS c;
+
+INSERT INTO users (id, name, email)
+SELECT u, 'User ' || u, 'user' || u || '@example.com' FROM generate_series(1, %(users)s) AS u;
+
+INSERT INTO user_preferences (user_id, category_id)
+SELECT u, 1 + ((u * 7 + k) %% %(categories)s)
+FROM generate_series(1, %(users)s) AS u, generate_series(0, 2) AS k;
+"""
+
+QUERIES = {
+    'candidates (1 category)': (
+        "SELECT product_id, discounted_price, actual_price, discount_percentage, rating, rating_count "
+        "FROM products WHERE category_id IN (3) AND discount_percentage > 0"
+    ),
+    'candidates (3 categories)': (
+        "SELECT product_id, discounted_price, actual_price, discount_percentage, rating, rating_count "
+        "FROM products WHERE category_id IN (1, 4, 7) AND discount_percentage > 0"
+    ),
+    'user preferences': "SELECT category_id FROM user_preferences WHERE user_id = 4242"
+}
+
+
+def execute_script(cursor, sql, params=None):
+    for statement in split_statements(sql):
+        cursor.execute(statement, params)
+
+
+def migration_sql(version):
+    for migration_version, path in migration_files(MIGRATIONS_DIR):
+        if migration_version == version:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+    raise SystemExit(f"Migration {version} not found in {MIGRATIONS_DIR}")
+
+
+def measure(cursor, repeat):
+    results = {}
+    for name, query in QUERIES.items():
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}")
+        plan = '\n'.join(line for (line,) in cursor.fetchall())
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(query)
+            rows = cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = {
+            'plan': plan,
+            'rows': len(rows),
+            'p50': statistics.median(timings),
+            'p95': sorted(timings)[max(0, int(round(0.95 * len(timings))) - 1)]
+        }
+    return results
+
+
+def print_plans(title, results):
+    print(f"\n{'=' * 20} {title} {'=' * 20}")
+    for name, result in results.items():
+        print(f"\n[{name}] {result['rows']} rows")
+        print(result['plan'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare recommendation query plans and latency before and after the index migration.')
+    parser.add_argument('--products', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--discounted-share', type=float, default=0.6)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--keep', action='store_true', help=f'Keep the {BENCH_SCHEMA} schema afterwards')
+    args = parser.parse_args()
+
+    load_dotenv()
+    engine = create_pool_engine(pool_size=1, max_overflow=0)
+    conn = engine.raw_connection()
+    conn.dbapi_connection.autocommit = True
+    cursor = conn.cursor()
+    params = {
+        'products': args.products,
+        'users': args.users,
+        'categories': args.categories,
+        'discounted_share': args.discounted_share
+    }
+
+    try:
+        print(f"[*] Building {BENCH_SCHEMA} with {args.products} products and {args.users} users...")
+        cursor.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {BENCH_SCHEMA}")
+        cursor.execute(f"SET search_path TO {BENCH_SCHEMA}")
+        execute_script(cursor, migration_sql('0001_baseline'))
+        cursor.execute(POPULATE_PRODUCTS_QUERY, params)
+        execute_script(cursor, POPULATE_USERS_QUERY, params)
+        cursor.execute("VACUUM ANALYZE")
+
+        before = measure(cursor, args.repeat)
+        print_plans('BEFORE', before)
+
+        print(f"\n[*] Applying {INDEX_MIGRATION}...")
+        started = time.perf_counter()
+        execute_script(cursor, migration_sql(INDEX_MIGRATION))
+        print(f"[✓] Indexes built in {time.perf_counter() - started:.1f}s")
+        cursor.execute("VACUUM ANALYZE")
+
+        after = measure(cursor, args.repeat)
+        print_plans('AFTER', after)
+
+        print(f"\n{'query':<28}{'rows':>9}{'before p50':>14}{'after p50':>13}{'before p95':>14}{'after p95':>13}{'speedup':>10}")
+        for name in QUERIES:
+            b, a = before[name], after[name]
+            print(f"{name:<28}{a['rows']:>9}{b['p50']:>11.2f} ms{a['p50']:>10.2f} ms"
+                  f"{b['p95']:>11.2f} ms{a['p95']:>10.2f} ms{b['p50'] / a['p50']:>9.1f}x")
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
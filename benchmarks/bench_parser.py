@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webscraping'))
+
+from product_parser import parse_document, parse_product
+from fixture_server import FIXTURES_DIR, serve_fixtures
+
+COMPARED_FIELDS = [
+    'product_id', 'product_name', 'discounted_price', 'actual_price', 'discount_percentage',
+    'rating', 'rating_count', 'about_product'
+]
+
+
+def load_pages(directory):
+    pages = {}
+    dp_dir = os.path.join(directory, 'dp')
+    for name in sorted(os.listdir(dp_dir)):
+        if name.endswith('.html'):
+            with open(os.path.join(dp_dir, name), 'rb') as f:
+                pages[name[:-len('.html')]] = f.read()
+    return pages
+
+
+def parse_page(product_id, html):
+    return parse_product(parse_document(html), f'https://www.amazon.com/dp/{product_id}', 'Fixture')
+
+
+def check_expected(pages, expected):
+    mismatches = []
+    for product_id, html in pages.items():
+        parsed = parse_page(product_id, html)
+        wanted = expected.get(product_id)
+        if parsed is None or wanted is None:
+            if parsed is not wanted:
+                mismatches.append((product_id, 'page', wanted is not None, parsed is not None))
+            continue
+        for field in COMPARED_FIELDS:
+            if parsed[field] != wanted[field]:
+                mismatches.append((product_id, field, wanted[field], parsed[field]))
+    return mismatches
+
+
+def percentile(timings, share):
+    ordered = sorted(timings)
+    return ordered[max(0, int(round(share * len(ordered))) - 1)]
+
+
+def measure(pages, repeat):
+    timings = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for product_id, html in pages.items():
+            page_started = time.perf_counter()
+            parse_page(product_id, html)
+            timings.append((time.perf_counter() - page_started) * 1000)
+    return timings, time.perf_counter() - started
+
+
+def measure_http(pages, repeat, directory):
+    server, base_url = serve_fixtures(directory, port=0)
+    session = requests.Session()
+    timings = []
+    started = time.perf_counter()
+    try:
+        for _ in range(repeat):
+            for product_id in pages:
+                page_started = time.perf_counter()
+                response = session.get(f'{base_url}/dp/{product_id}', timeout=10)
+                parse_page(product_id, response.content)
+                timings.append((time.perf_counter() - page_started) * 1000)
+    finally:
+        server.shutdown()
+    return timings, time.perf_counter() - started
+
+
+def report(name, timings, elapsed):
+    print(f"{name:<18}{len(timings):>8}{statistics.median(timings):>11.2f} ms{percentile(timings, 0.95):>11.2f} ms"
+          f"{len(timings) / elapsed:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the product page parser against the offline fixture corpus.')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--http', action='store_true', help='Also fetch every page from a local fixture server')
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures)
+    with open(os.path.join(args.fixtures, 'expected.json'), 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+
+    mismatches = check_expected(pages, expected)
+    for product_id, field, wanted, got in mismatches:
+        print(f"[✗] {product_id} {field}: expected {wanted!r}, got {got!r}")
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} fields differ from {args.fixtures}/expected.json")
+    size = sum(len(html) for html in pages.values()) / len(pages) / 1024
+    print(f"[✓] {len(pages)} fixture pages ({size:.0f} KB average) match expected.json")
+
+    print(f"\n{'mode':<18}{'pages':>8}{'p50':>14}{'p95':>14}{'pages/s':>12}")
+    report('parse', *measure(pages, args.repeat))
+    if args.http:
+        report('http + parse', *measure_http(pages, args.repeat, args.fixtures))
+
+
+if __name__ == '__main__':
+    main()
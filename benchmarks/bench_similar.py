@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'flask'))
+
+from similarity import PROBES, VECTOR_DIM, SimilarityIndex, build_category, normalize, publish, write_lookup
+
+
+def synthetic_vectors(n, dim, topics, rng):
+    centers = normalize(rng.standard_normal((topics, dim)).astype(np.float32))
+    noise = rng.standard_normal((n, dim)).astype(np.float32) * 0.08
+    return normalize(centers[rng.integers(0, topics, n)] + noise)
+
+
+def percentile(timings, share):
+    ordered = sorted(timings)
+    return ordered[max(0, int(round(share * len(ordered))) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark similar-product lookups on a synthetic memory-mapped index.')
+    parser.add_argument('--products', type=int, default=1_000_000)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--dim', type=int, default=VECTOR_DIM)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--probes', type=int, default=PROBES)
+    parser.add_argument('--keep', help='Write the index to this directory and keep it')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    model_dir = args.keep or tempfile.mkdtemp(prefix='bench-similar-')
+    version = 'bench'
+    version_dir = os.path.join(model_dir, version)
+    per_category = args.products // args.categories
+
+    try:
+        print(f"[*] Building {args.categories} category indexes with {per_category} products each...")
+        started = time.perf_counter()
+        category_ids = {}
+        exact = {}
+        for category_id in range(1, args.categories + 1):
+            vectors = synthetic_vectors(per_category, args.dim, 1000, rng)
+            product_ids = [f'B{category_id:02d}{i:08d}' for i in range(per_category)]
+            category_ids[category_id] = build_category(vectors, product_ids, os.path.join(version_dir, str(category_id)))
+            exact[category_id] = (vectors, product_ids)
+        write_lookup(version_dir, category_ids)
+        publish(version_dir, model_dir, {'version': version, 'dim': args.dim, 'products': per_category * args.categories})
+        print(f"[✓] Index built in {time.perf_counter() - started:.1f}s")
+
+        index = SimilarityIndex.load(version, model_dir)
+        samples = [
+            (int(category_id), int(row))
+            for category_id, row in zip(rng.integers(1, args.categories + 1, args.queries), rng.integers(0, per_category, args.queries))
+        ]
+        for category_id in category_ids:
+            index.category(category_id)
+
+        timings = []
+        recalls = []
+        for category_id, row in samples:
+            vectors, product_ids = exact[category_id]
+            started = time.perf_counter()
+            neighbours = index.similar(product_ids[row], 10, probes=args.probes)
+            timings.append((time.perf_counter() - started) * 1000)
+            if len(recalls) < 200:
+                scores = vectors @ vectors[row]
+                scores[row] = -np.inf
+                truth = {product_ids[i] for i in np.argpartition(scores, -10)[-10:]}
+                recalls.append(len(truth & {product_id for product_id, _ in neighbours}) / 10)
+
+        print(f"\n{'products':>10}{'probes':>8}{'p50':>12}{'p95':>12}{'p99':>12}{'recall@10':>12}")
+        print(f"{per_category * args.categories:>10}{args.probes:>8}{statistics.median(timings):>9.3f} ms"
+              f"{percentile(timings, 0.95):>9.3f} ms{percentile(timings, 0.99):>9.3f} ms{statistics.mean(recalls):>12.2f}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(model_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import resource
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSV_DIR = os.path.join(ROOT_DIR, 'amazon_data')
+
+sys.path.insert(0, os.path.join(ROOT_DIR, 'flask'))
+
+ENDPOINTS = ['index', 'register', 'signin', 'welcome', 'recommendations']
+CATEGORY_COUNT = 10
+CATEGORY_NAMES = []
+
+
+class NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class VirtualUser:
+    def __init__(self, base_url, index, run_id):
+        self.base_url = base_url
+        self.name = f'Load User {index}'
+        self.email = f'load-{run_id}-{index}@example.com'
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()), NoRedirect())
+
+    def request(self, path, data=None):
+        body = urlencode(data, doseq=True).encode() if data is not None else None
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=120) as response:
+                return response.status, response.read()
+        except HTTPError as e:
+            return e.code, e.read()
+
+    def index(self):
+        return self.request('/')
+
+    def register(self):
+        categories = random.sample(CATEGORY_NAMES, random.randint(1, 3))
+        return self.request('/register', {'name': self.name, 'email': self.email, 'categories': categories})
+
+    def signin(self):
+        return self.request('/signin', {'name': self.name, 'email': self.email})
+
+    def welcome(self):
+        return self.request('/welcome')
+
+    def recommendations(self):
+        status, body = self.request('/api/recommendations')
+        while status == 202:
+            time.sleep(0.02)
+            status, body = self.request(json.loads(body)['status_url'])
+        return status, body
+
+
+class RssSampler:
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self.start_rss = current_rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.end_rss = current_rss()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.samples.append(current_rss())
+
+    @property
+    def peak(self):
+        return max(self.samples + [self.start_rss, self.end_rss])
+
+
+def current_rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def load_templates():
+    templates = []
+    for path in glob.glob(os.path.join(CSV_DIR, '*.csv')):
+        if os.path.basename(path) == 'categories.csv':
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if row.get('product_name') and row.get('about_product'):
+                    templates.append(row)
+    if not templates:
+        templates.append({'product_name': 'Synthetic product', 'about_product': 'Synthetic description.', 'product_link': ''})
+    return templates
+
+
+def synthetic_products(count, run_id):
+    templates = load_templates()
+    for i in range(count):
+        template = random.choice(templates)
+        actual_price = round(random.uniform(5, 1000), 2)
+        discount = round(random.uniform(1, 70), 1) if random.random() < 0.7 else 0.0
+        yield {
+            'product_id': f'L{run_id}{i:09d}',
+            'product_name': template['product_name'],
+            'category': f'Category {i % CATEGORY_COUNT + 1}',
+            'discounted_price': round(actual_price * (1 - discount / 100), 2),
+            'actual_price': actual_price,
+            'discount_percentage': discount,
+            'rating': round(random.uniform(1, 5), 1),
+            'rating_count': random.randint(0, 20000),
+            'about_product': template['about_product'],
+            'product_link': template.get('product_link', ''),
+            'category_id': i % CATEGORY_COUNT + 1
+        }
+
+
+def seed(app_module, products, run_id, batch_size=5000):
+    app, db = app_module.app, app_module.db
+    with app.app_context():
+        app_module.create_tables()
+        batch = []
+        for row in synthetic_products(products, run_id):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                db.session.execute(app_module.Product.__table__.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(app_module.Product.__table__.insert(), batch)
+        db.session.commit()
+        return [name for (name,) in db.session.query(app_module.Category.name).all()]
+
+
+def wait_ready(base_url, timeout=60):
+    opener = build_opener()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with opener.open(base_url + '/readyz', timeout=10) as response:
+                if response.status == 200:
+                    return
+        except (HTTPError, OSError):
+            pass
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f'{base_url}/readyz did not report ready within {timeout}s')
+        time.sleep(0.1)
+
+
+def run_phase(endpoint, users, iterations, concurrency):
+    latencies = []
+    errors = Counter()
+    lock = threading.Lock()
+
+    def drive(user):
+        for _ in range(iterations):
+            started = time.perf_counter()
+            status, _ = getattr(user, endpoint)()
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if status >= 400:
+                    errors[status] += 1
+
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(drive, users))
+        duration = time.perf_counter() - started
+
+    return {
+        'endpoint': endpoint,
+        'requests': len(latencies),
+        'errors': sum(errors.values()),
+        'error_statuses': {str(status): count for status, count in sorted(errors.items())},
+        'throughput': len(latencies) / duration if duration else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'rss_peak_mb': rss.peak / 1024 / 1024,
+        'rss_delta_mb': (rss.end_rss - rss.start_rss) / 1024 / 1024
+    }
+
+
+def print_report(results):
+    print(f"\n{'endpoint':<17}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rss MB':>9}{'Δrss MB':>9}")
+    for r in results:
+        print(f"{r['endpoint']:<17}{r['requests']:>9}{r['errors']:>8}{r['throughput']:>9.1f}{r['p50']:>10.1f}"
+              f"{r['p95']:>10.1f}{r['p99']:>10.1f}{r['rss_peak_mb']:>9.1f}{r['rss_delta_mb']:>9.1f}")
+    for r in results:
+        if r['errors']:
+            breakdown = ', '.join(f'{count} x {status}' for status, count in r['error_statuses'].items())
+            print(f"[✗] {r['endpoint']} errors by status: {breakdown}")
+
+
+def main():
+    global CATEGORY_NAMES
+
+    parser = argparse.ArgumentParser(description='Seed a synthetic catalog and load-test the Flask endpoints with concurrent users.')
+    parser.add_argument('--database-url', help='Database to seed and serve from (default: a throwaway SQLite file)')
+    parser.add_argument('--products', type=int, default=10_000)
+    parser.add_argument('--users', type=int, default=20, help='Number of simulated users')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--iterations', type=int, default=10, help='Requests per user for each endpoint')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='loadtest-')
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(workdir, 'loadtest.sqlite3')}"
+    os.environ.setdefault('MODEL_DIR', os.path.join(workdir, 'models'))
+    os.environ.setdefault('FEATURE_SNAPSHOT_DIR', os.path.join(workdir, 'models', 'features'))
+    os.environ.setdefault('SIMILARITY_DIR', os.path.join(workdir, 'models', 'similarity'))
+    os.environ.setdefault('DB_POOL_SIZE', str(args.concurrency))
+
+    from werkzeug.serving import make_server
+    import app as app_module
+
+    run_id = f'{int(time.time()) % 100000:05d}'
+    print(f"[*] Seeding {args.products} products into {os.environ['DATABASE_URL']}...")
+    started = time.perf_counter()
+    CATEGORY_NAMES = seed(app_module, args.products, run_id)
+    print(f"[✓] Seeded in {time.perf_counter() - started:.1f}s")
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    users = [VirtualUser(base_url, i, run_id) for i in range(args.users)]
+    wait_ready(base_url)
+    print("[✓] App reports ready")
+
+    results = []
+    try:
+        for endpoint in args.endpoints.split(','):
+            iterations = 1 if endpoint == 'register' else args.iterations
+            print(f"[*] {endpoint}: {args.users} users x {iterations} requests, concurrency {args.concurrency}")
+            results.append(run_phase(endpoint, users, iterations, args.concurrency))
+    finally:
+        server.shutdown()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
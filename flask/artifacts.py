@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+
+ARTIFACT_KEEP = int(os.environ.get('ARTIFACT_KEEP', 3))
+
+
+def new_version():
+    return f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def latest_version(artifact_dir):
+    try:
+        with open(os.path.join(artifact_dir, 'LATEST')) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def load_meta(artifact_dir, version):
+    try:
+        with open(os.path.join(artifact_dir, version, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def prune(artifact_dir, keep=ARTIFACT_KEEP):
+    current = latest_version(artifact_dir)
+    versions = sorted(
+        (os.path.join(artifact_dir, name) for name in os.listdir(artifact_dir) if name != current),
+        key=os.path.getmtime
+    )
+    versions = [path for path in versions if os.path.isdir(path)]
+    for path in versions[:max(0, len(versions) - (keep - 1))]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def publish(version_dir, artifact_dir, meta, keep=ARTIFACT_KEEP):
+    with open(os.path.join(version_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    latest_tmp = os.path.join(artifact_dir, 'LATEST.tmp')
+    with open(latest_tmp, 'w') as f:
+        f.write(meta['version'])
+    os.replace(latest_tmp, os.path.join(artifact_dir, 'LATEST'))
+    prune(artifact_dir, keep)
+
+
+class ArtifactStore:
+    def __init__(self, artifact_dir, load, name, reload_interval):
+        self.artifact_dir = artifact_dir
+        self.load = load
+        self.name = name
+        self.reload_interval = reload_interval
+        self._current = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            self.refresh()
+        return self._current
+
+    def peek(self):
+        return self._current
+
+    def refresh(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            version = latest_version(self.artifact_dir)
+            if version is None or (self._current and self._current.version == version):
+                return self._current
+            try:
+                self._current = self.load(version, self.artifact_dir)
+                print(f"[✓] Loaded {self.name} version {version}")
+            except Exception as e:
+                print(f"[✗] Error loading {self.name} {version}: {str(e)}")
+            return self._current
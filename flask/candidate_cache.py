@@ -0,0 +1,36 @@
+import os
+import sys
+
+from ttl_cache import TTLCache
+
+CANDIDATE_CACHE_MAX_BYTES = int(os.environ.get('CANDIDATE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+CANDIDATE_CACHE_TTL = float(os.environ.get('CANDIDATE_CACHE_TTL', 300))
+
+
+def estimate_size(candidates):
+    size = sys.getsizeof(candidates)
+    for candidate in candidates:
+        size += sys.getsizeof(candidate)
+        for value in candidate:
+            size += sys.getsizeof(value)
+            if isinstance(value, dict):
+                size += sum(sys.getsizeof(item) for item in value.values())
+    return size
+
+
+class CandidateCache(TTLCache):
+    def __init__(self, max_bytes=CANDIDATE_CACHE_MAX_BYTES, ttl=CANDIDATE_CACHE_TTL):
+        super().__init__(ttl, max_bytes=max_bytes)
+
+    def get(self, category_id, version):
+        return self._get(category_id, version)
+
+    def put(self, category_id, version, candidates):
+        self._put(category_id, candidates, version, estimate_size(candidates))
+
+    def invalidate(self, category_ids=None):
+        if category_ids is None:
+            self._invalidate()
+        else:
+            category_ids = set(category_ids)
+            self._invalidate(lambda category_id, _: category_id in category_ids)
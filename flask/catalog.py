@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import select
+import threading
+from types import MappingProxyType
+
+CATALOG_POLL_INTERVAL = float(os.environ.get('CATALOG_POLL_INTERVAL', 5))
+CATEGORY_POLL_INTERVAL = float(os.environ.get('CATEGORY_POLL_INTERVAL', 60))
+CATALOG_LISTEN_RETRY = float(os.environ.get('CATALOG_LISTEN_RETRY', 5))
+CATALOG_CHANNEL = 'catalog_updated'
+
+BUMP_CATALOG_VERSION_QUERY = """
+INSERT INTO catalog_versions (category_id, version, updated_at) VALUES (%s, 1, now())
+ON CONFLICT (category_id) DO UPDATE SET
+    version = catalog_versions.version + 1,
+    updated_at = now()
+"""
+
+CATALOG_IDENTITY_QUERY = "SELECT database_id FROM catalog_identity"
+
+
+def bump_catalog_versions(cursor, category_ids):
+    category_ids = sorted({c for c in category_ids if c is not None})
+    for category_id in category_ids:
+        cursor.execute(BUMP_CATALOG_VERSION_QUERY, (category_id,))
+    if category_ids:
+        cursor.execute("SELECT pg_notify(%s, %s)", (CATALOG_CHANNEL, json.dumps({'category_ids': category_ids})))
+    return category_ids
+
+
+def catalog_identity(cursor):
+    cursor.execute(CATALOG_IDENTITY_QUERY)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class CategorySnapshot:
+    def __init__(self, rows):
+        self.by_id = MappingProxyType({category_id: name for category_id, name in rows})
+        self.by_name = MappingProxyType({name: category_id for category_id, name in rows})
+
+    def name(self, category_id, default=''):
+        return self.by_id.get(category_id, default)
+
+    def ids(self, names):
+        return [self.by_name[name] for name in dict.fromkeys(names) if name in self.by_name]
+
+
+class PolledSnapshot:
+    def __init__(self, fetch, poll_interval=CATALOG_POLL_INTERVAL, on_change=None):
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self.on_change = on_change
+        self._value = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.poll_interval:
+            with self._lock:
+                if self._checked_at is None or now - self._checked_at >= self.poll_interval:
+                    previous, self._value = self._value, self.fetch()
+                    self._checked_at = now
+                    if self.on_change is not None and previous is not None and previous != self._value:
+                        self.on_change(previous, self._value)
+        return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._checked_at = None
+
+
+class CatalogListener:
+    def __init__(self, connect, on_update, channel=CATALOG_CHANNEL, retry_interval=CATALOG_LISTEN_RETRY):
+        self.connect = connect
+        self.on_update = on_update
+        self.channel = channel
+        self.retry_interval = retry_interval
+        self.events = 0
+
+    def start(self):
+        threading.Thread(target=self._run, name='catalog-listener', daemon=True).start()
+        return self
+
+    def _run(self):
+        while True:
+            conn = None
+            try:
+                conn = self.connect()
+                dbapi_connection = conn.dbapi_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                while True:
+                    if select.select([dbapi_connection], [], [], 60) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        notify = dbapi_connection.notifies.pop(0)
+                        self.events += 1
+                        self.on_update(json.loads(notify.payload)['category_ids'])
+            except Exception as e:
+                print(f"[✗] Catalog listener disconnected: {str(e)}")
+            finally:
+                if conn is not None:
+                    conn.invalidate()
+            time.sleep(self.retry_interval)
@@ -0,0 +1,30 @@
+import os
+import argparse
+import numpy as np
+from tensorflow.keras.models import load_model
+
+from ranking import FEATURE_COLUMNS, MODEL_DIR, latest_version, export_mlp, validate_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fold a trained Keras ranking model into the NumPy inference runtime.')
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--version', help='Model version to export (default: LATEST)')
+    parser.add_argument('--samples', type=int, default=10_000, help='Random inputs used to validate the export')
+    args = parser.parse_args()
+
+    version = args.version or latest_version(args.model_dir)
+    if version is None:
+        raise SystemExit(f"No ranking model found in {args.model_dir}")
+    version_dir = os.path.join(args.model_dir, version)
+
+    model = load_model(os.path.join(version_dir, 'model.keras'))
+    mlp = export_mlp(model)
+    X_scaled = np.random.default_rng(0).standard_normal((args.samples, len(FEATURE_COLUMNS)))
+    error = validate_export(model, mlp, X_scaled)
+    mlp.save(os.path.join(version_dir, 'weights.npz'))
+    print(f"[✓] Exported ranking model {version}, max deviation from Keras {error:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+from dotenv import load_dotenv
+
+from artifacts import ArtifactStore, latest_version as latest_artifact_version, load_meta, new_version, publish
+from catalog import catalog_identity
+from ranking import FEATURE_COLUMNS, latest_version as latest_model_version, top_k_indices, weighted_scores
+
+SNAPSHOT_DIR = os.environ.get(
+    'FEATURE_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models', 'features')
+)
+SNAPSHOT_RELOAD_INTERVAL = float(os.environ.get('FEATURE_SNAPSHOT_RELOAD_INTERVAL', 5))
+BATCH_SIZE = 10_000
+PRICE_COLUMNS = ['current_price', 'previous_price', 'changed_at', 'min_price_30d']
+EPOCH = datetime(1970, 1, 1)
+
+SNAPSHOT_FILTER = ' AND '.join(
+    ['p.category_id IS NOT NULL', 'p.discount_percentage > 0'] + [f'p.{column} IS NOT NULL' for column in FEATURE_COLUMNS]
+)
+
+SNAPSHOT_SIZE_QUERY = f"""
+SELECT count(*), COALESCE(max(octet_length(p.product_id)), 1) FROM products p
+WHERE {SNAPSHOT_FILTER}
+"""
+
+SNAPSHOT_PRODUCTS_QUERY = f"""
+SELECT
+    p.product_id, p.category_id, {', '.join(f'p.{column}' for column in FEATURE_COLUMNS)},
+    CASE WHEN s.model_version = %s THEN s.score END,
+    ps.current_price, ps.previous_price, extract(epoch FROM ps.changed_at), ps.min_price_30d,
+    p.product_name, COALESCE(p.about_product, ''), COALESCE(p.product_link, '')
+FROM products p
+LEFT JOIN product_scores s ON s.product_id = p.product_id
+LEFT JOIN price_stats ps ON ps.product_id = p.product_id
+WHERE {SNAPSHOT_FILTER}
+ORDER BY p.category_id, p.product_id
+"""
+
+CATALOG_VERSIONS_QUERY = "SELECT category_id, version FROM catalog_versions"
+
+
+def latest_version(snapshot_dir=SNAPSHOT_DIR):
+    return latest_artifact_version(snapshot_dir)
+
+
+def write_rows(version_dir, cursor, size, id_width, batch_size):
+    open_memmap = np.lib.format.open_memmap
+    ids = open_memmap(os.path.join(version_dir, 'ids.npy'), mode='w+', dtype=f'S{id_width}', shape=(size,))
+    features = open_memmap(os.path.join(version_dir, 'features.npy'), mode='w+', dtype=np.float64, shape=(size, len(FEATURE_COLUMNS)))
+    scores = open_memmap(os.path.join(version_dir, 'scores.npy'), mode='w+', dtype=np.float64, shape=(size,))
+    prices = open_memmap(os.path.join(version_dir, 'prices.npy'), mode='w+', dtype=np.float64, shape=(size, len(PRICE_COLUMNS)))
+    category_column = np.empty(size, dtype=np.int32)
+    text_offsets = np.zeros(size + 1, dtype=np.int64)
+
+    row = 0
+    with open(os.path.join(version_dir, 'text.bin'), 'wb') as text_file:
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            end = row + len(batch)
+            columns = list(zip(*batch))
+            ids[row:end] = [product_id.encode('utf-8') for product_id in columns[0]]
+            category_column[row:end] = columns[1]
+            features[row:end] = np.array(columns[2:7], dtype=np.float64).T
+            scores[row:end] = np.array(columns[7], dtype=np.float64)
+            prices[row:end] = np.array(columns[8:12], dtype=np.float64).T
+            for i, record in enumerate(batch, start=row + 1):
+                encoded = json.dumps(record[12:], ensure_ascii=False).encode('utf-8')
+                text_file.write(encoded)
+                text_offsets[i] = text_offsets[i - 1] + len(encoded)
+            row = end
+
+    for array in (ids, features, scores, prices):
+        array.flush()
+    categories, starts = np.unique(category_column[:row], return_index=True)
+    np.save(os.path.join(version_dir, 'text_offsets.npy'), text_offsets[:row + 1])
+    np.save(os.path.join(version_dir, 'categories.npy'), categories.astype(np.int32))
+    np.save(os.path.join(version_dir, 'offsets.npy'), np.append(starts, row).astype(np.int64))
+    return row, categories
+
+
+def export_snapshot(engine, snapshot_dir=SNAPSHOT_DIR, force=False, batch_size=BATCH_SIZE):
+    score_version = latest_model_version()
+    os.makedirs(snapshot_dir, exist_ok=True)
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            cursor.execute(CATALOG_VERSIONS_QUERY)
+            catalog_versions = {str(category_id): version for category_id, version in cursor.fetchall()}
+            database_id = catalog_identity(cursor)
+            current = latest_version(snapshot_dir)
+            meta = load_meta(snapshot_dir, current) if current else None
+            if not force and meta and meta.get('database_id') == database_id and \
+                    meta['catalog_versions'] == catalog_versions and meta['score_version'] == score_version:
+                return None
+            cursor.execute(SNAPSHOT_SIZE_QUERY)
+            size, id_width = cursor.fetchone()
+
+        version = new_version()
+        version_dir = os.path.join(snapshot_dir, version)
+        os.makedirs(version_dir, exist_ok=True)
+        with conn.cursor(name='feature_snapshot') as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(SNAPSHOT_PRODUCTS_QUERY, (score_version,))
+            products, categories = write_rows(version_dir, cursor, size, id_width, batch_size)
+    finally:
+        conn.rollback()
+        conn.close()
+
+    publish(version_dir, snapshot_dir, {
+        'version': version,
+        'database_id': database_id,
+        'products': int(products),
+        'categories': categories.tolist(),
+        'catalog_versions': catalog_versions,
+        'score_version': score_version,
+        'built_at': time.time()
+    })
+    return version
+
+
+class FeatureSnapshot:
+    def __init__(self, version, version_dir):
+        self.version = version
+        with open(os.path.join(version_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        self.database_id = meta.get('database_id')
+        self.catalog_versions = {int(category_id): v for category_id, v in meta['catalog_versions'].items()}
+        self.score_version = meta['score_version']
+        self.ids = np.load(os.path.join(version_dir, 'ids.npy'), mmap_mode='r')
+        self.features = np.load(os.path.join(version_dir, 'features.npy'), mmap_mode='r')
+        self.scores = np.load(os.path.join(version_dir, 'scores.npy'), mmap_mode='r')
+        self.prices = np.load(os.path.join(version_dir, 'prices.npy'), mmap_mode='r')
+        self.text_offsets = np.load(os.path.join(version_dir, 'text_offsets.npy'), mmap_mode='r')
+        text_path = os.path.join(version_dir, 'text.bin')
+        self.text = np.memmap(text_path, dtype=np.uint8, mode='r') if os.path.getsize(text_path) else np.empty(0, dtype=np.uint8)
+        categories = np.load(os.path.join(version_dir, 'categories.npy'))
+        offsets = np.load(os.path.join(version_dir, 'offsets.npy'))
+        self.ranges = {
+            int(category_id): (int(offsets[i]), int(offsets[i + 1])) for i, category_id in enumerate(categories)
+        }
+
+    @classmethod
+    def load(cls, version, snapshot_dir=SNAPSHOT_DIR):
+        return cls(version, os.path.join(snapshot_dir, version))
+
+    def covers(self, database_id, category_id, catalog_version):
+        return (
+            self.database_id is not None and self.database_id == database_id
+            and (category_id in self.catalog_versions or category_id in self.ranges)
+            and self.catalog_versions.get(category_id, 0) == catalog_version
+        )
+
+    def rank(self, category_id, model=None, limit=20):
+        start, end = self.ranges.get(category_id, (0, 0))
+        if start == end:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        X = np.asarray(self.features[start:end])
+        if model is None:
+            predictions = weighted_scores(X)
+        else:
+            if model.version == self.score_version:
+                predictions = np.array(self.scores[start:end])
+            else:
+                predictions = np.full(end - start, np.nan)
+            missing = np.isnan(predictions)
+            if missing.any():
+                predictions[missing] = model.predict(X[missing])
+        top = top_k_indices(predictions, limit)
+        return start + top, predictions[top]
+
+    def product_id(self, row):
+        return self.ids[row].decode('utf-8')
+
+    def product(self, row, category_name=''):
+        product_name, about_product, product_link = json.loads(
+            self.text[self.text_offsets[row]:self.text_offsets[row + 1]].tobytes()
+        )
+        discounted_price, actual_price, discount_percentage, rating, rating_count = self.features[row].tolist()
+        return {
+            'product_id': self.product_id(row),
+            'product_name': product_name,
+            'discounted_price': discounted_price,
+            'actual_price': actual_price,
+            'discount_percentage': discount_percentage,
+            'rating': rating,
+            'rating_count': int(rating_count),
+            'about_product': about_product,
+            'category_name': category_name,
+            'product_link': product_link
+        }
+
+    def price_stats(self, row):
+        current_price, previous_price, changed_at, min_price_30d = self.prices[row].tolist()
+        if np.isnan(current_price):
+            return ()
+        return (
+            current_price,
+            None if np.isnan(previous_price) else previous_price,
+            EPOCH + timedelta(seconds=changed_at),
+            min_price_30d
+        )
+
+
+class SnapshotStore(ArtifactStore):
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR, reload_interval=SNAPSHOT_RELOAD_INTERVAL):
+        super().__init__(snapshot_dir, FeatureSnapshot.load, 'feature snapshot', reload_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the memory-mapped product feature snapshot used for candidate retrieval.')
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR)
+    parser.add_argument('--force', action='store_true', help='Export even if the catalog has not changed')
+    args = parser.parse_args()
+
+    from db_pool import create_pool_engine
+
+    load_dotenv()
+    engine = create_pool_engine(pool_size=1, max_overflow=0)
+    started = time.perf_counter()
+    version = export_snapshot(engine, snapshot_dir=args.snapshot_dir, force=args.force)
+    if version is None:
+        print("[→] Catalog unchanged since the last snapshot, nothing to export")
+        return
+    meta = load_meta(args.snapshot_dir, version)
+    print(f"[✓] Exported {meta['products']} products in {len(meta['categories'])} categories "
+          f"as snapshot {version} ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
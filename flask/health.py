@@ -0,0 +1,72 @@
+import os
+import time
+import threading
+from psycopg2 import Error as DriverError
+from sqlalchemy.exc import SQLAlchemyError
+
+READINESS_INTERVAL = float(os.environ.get('READINESS_INTERVAL', 5))
+READINESS_MIN_BACKOFF = float(os.environ.get('READINESS_MIN_BACKOFF', 0.5))
+READINESS_MAX_BACKOFF = float(os.environ.get('READINESS_MAX_BACKOFF', 30))
+
+
+class ReadinessProbe:
+    def __init__(self, check, on_ready=None, interval=READINESS_INTERVAL,
+                 min_backoff=READINESS_MIN_BACKOFF, max_backoff=READINESS_MAX_BACKOFF):
+        self.check_fn = check
+        self.on_ready = on_ready
+        self.interval = interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.ready = False
+        self.error = None
+        self.failures = 0
+        self.checked_at = None
+        self._backoff = min_backoff
+        self._next_check = 0.0
+        self._bootstrapped = False
+        self._lock = threading.Lock()
+
+    def check(self):
+        if time.monotonic() < self._next_check:
+            return self.ready
+        if not self._lock.acquire(blocking=self.checked_at is None):
+            return self.ready
+        try:
+            if time.monotonic() < self._next_check:
+                return self.ready
+            try:
+                self.check_fn()
+                if not self._bootstrapped and self.on_ready is not None:
+                    self.on_ready()
+                self._bootstrapped = True
+            except (SQLAlchemyError, DriverError) as e:
+                self.ready = False
+                self.error = str(e).strip().splitlines()[0]
+                self.failures += 1
+                self._next_check = time.monotonic() + self._backoff
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+                print(f"[✗] Database not ready (attempt {self.failures}), retrying in {self.retry_after():.1f}s: {self.error}")
+            else:
+                if not self.ready:
+                    print("[✓] Database is ready.")
+                self.ready = True
+                self.error = None
+                self.failures = 0
+                self._backoff = self.min_backoff
+                self._next_check = time.monotonic() + self.interval
+            self.checked_at = time.time()
+            return self.ready
+        finally:
+            self._lock.release()
+
+    def retry_after(self):
+        return max(0.0, self._next_check - time.monotonic())
+
+    def status(self):
+        return {
+            'ready': self.ready,
+            'error': self.error,
+            'failures': self.failures,
+            'checked_at': self.checked_at,
+            'retry_after': self.retry_after() if not self.ready else None
+        }
@@ -0,0 +1,235 @@
+import os
+import sys
+import time
+import uuid
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from flask import g, has_app_context
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+PROFILE_HEADER = 'X-Profile'
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', 0.005))
+PROFILES_KEPT = 20
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{str(value)}"'.replace('\n', ' ') for key, value in labels)
+    return '{' + pairs + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, (bucket_counts, total, count) in sorted(self._series.items()):
+                labels = list(zip(self.labelnames, key))
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    lines.append(f"{self.name}_bucket{format_labels(labels + [('le', format_value(bound))])} {bucket_count}")
+                lines.append(f'{self.name}_sum{format_labels(labels)} {total}')
+                lines.append(f'{self.name}_count{format_labels(labels)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._histograms = []
+        self._collectors = []
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def add_collector(self, collect):
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for collect in self._collectors:
+            for name, metric_type, documentation, samples in collect():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    lines.append(f'{name}{format_labels(sorted(labels.items()))} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+request_seconds = registry.histogram(
+    'app_http_request_duration_seconds', 'Time spent handling HTTP requests.', ('endpoint', 'method', 'status')
+)
+stage_seconds = registry.histogram(
+    'app_stage_duration_seconds', 'Time spent in recommendation pipeline stages.', ('stage',)
+)
+query_seconds = registry.histogram(
+    'app_db_query_duration_seconds', 'Time spent executing SQL statements.'
+)
+request_queries = registry.histogram(
+    'app_db_queries_per_request', 'Number of SQL statements issued per HTTP request.', ('endpoint',), COUNT_BUCKETS
+)
+
+
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    def totals(self):
+        totals = OrderedDict()
+        for name, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def server_timing(self):
+        entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.totals().items()]
+        entries.append(f'db;desc="{self.queries} queries";dur={self.query_seconds * 1000:.2f}')
+        entries.append(f'total;dur={(time.perf_counter() - self.started) * 1000:.2f}')
+        return ', '.join(entries)
+
+    def to_dict(self):
+        return {
+            'spans_ms': {name: round(seconds * 1000, 2) for name, seconds in self.totals().items()},
+            'queries': self.queries,
+            'db_ms': round(self.query_seconds * 1000, 2),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2)
+        }
+
+
+def current_trace():
+    if has_app_context():
+        return g.get('trace')
+    return None
+
+
+@contextmanager
+def span(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_seconds.observe(elapsed, stage=name)
+        trace = current_trace()
+        if trace is not None:
+            trace.spans.append((name, elapsed))
+
+
+class SamplingProfiler:
+    def __init__(self, interval=PROFILE_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def __enter__(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                frame = frame.f_back
+            self.samples[';'.join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def collapsed(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in self.samples.most_common()) + '\n'
+
+
+class ProfileStore:
+    def __init__(self, keep=PROFILES_KEPT):
+        self.keep = keep
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, collapsed):
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            self._profiles[profile_id] = collapsed
+            while len(self._profiles) > self.keep:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+def instrument_engine(engine):
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        query_seconds.observe(elapsed)
+        trace = current_trace()
+        if trace is not None:
+            trace.queries += 1
+            trace.query_seconds += elapsed
+
+
+def stats_collector(prefix, stats, counters=()):
+    def collect():
+        for key, value in stats().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            description = f"{key.replace('_', ' ')} reported by {prefix}."
+            if key in counters:
+                name = f'{prefix}_{key}' if key.endswith('_total') else f'{prefix}_{key}_total'
+                yield name, 'counter', description, [({}, value)]
+            else:
+                yield f'{prefix}_{key}', 'gauge', description, [({}, value)]
+    return collect
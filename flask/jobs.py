@@ -0,0 +1,100 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+RECOMMENDATION_WORKERS = int(os.environ.get('RECOMMENDATION_WORKERS', 2))
+JOB_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', 120))
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Job:
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = PENDING
+        self.payload = None
+        self.status_code = None
+        self.created_at = time.monotonic()
+        self.finished_at = None
+        self.finished = threading.Event()
+
+    def wait(self, timeout=None):
+        return self.finished.wait(timeout)
+
+    def to_dict(self):
+        data = {'job_id': self.id, 'status': self.status}
+        if self.payload is not None:
+            data.update(self.payload)
+        return data
+
+
+class JobQueue:
+    def __init__(self, max_workers=RECOMMENDATION_WORKERS, result_ttl=JOB_RESULT_TTL):
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='recommendations')
+        self._jobs = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.coalesced = 0
+
+    def submit(self, key, fn, *args):
+        with self._lock:
+            self._purge()
+            job_id = self._in_flight.get(key)
+            if job_id is not None:
+                self.coalesced += 1
+                return self._jobs[job_id]
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job.id
+            self.submitted += 1
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._in_flight),
+                'pending': statuses.count(PENDING),
+                'running': statuses.count(RUNNING),
+                'done': statuses.count(DONE),
+                'failed': statuses.count(FAILED)
+            }
+
+    def _run(self, job, fn, args):
+        job.status = RUNNING
+        try:
+            job.payload, job.status_code = fn(*args)
+            job.status = DONE
+        except Exception as e:
+            job.payload, job.status_code = {'error': f'Recommendation job failed: {str(e)}'}, 500
+            job.status = FAILED
+        finally:
+            job.finished_at = time.monotonic()
+            with self._lock:
+                if self._in_flight.get(job.key) == job.id:
+                    del self._in_flight[job.key]
+            job.finished.set()
+
+    def _purge(self):
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,127 @@
+import os
+import re
+import glob
+import argparse
+from dotenv import load_dotenv
+
+from db_pool import create_pool_engine
+
+MIGRATIONS_DIR = os.environ.get(
+    'MIGRATIONS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'postgresql', 'migrations')
+)
+MIGRATIONS_LOCK_ID = 741_820_001
+NO_TRANSACTION_DIRECTIVE = '-- migrate: no-transaction'
+CONCURRENT_INDEX_PATTERN = re.compile(
+    r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+("?[\w.]+"?)', re.IGNORECASE
+)
+DOLLAR_QUOTE_PATTERN = re.compile(r'\$\w*\$')
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+
+INVALID_INDEX_QUERY = "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)"
+
+CREATE_MIGRATIONS_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version TEXT PRIMARY KEY,
+    applied_at TIMESTAMP NOT NULL DEFAULT now()
+)
+"""
+
+
+def migration_files(migrations_dir=MIGRATIONS_DIR):
+    paths = sorted(glob.glob(os.path.join(migrations_dir, '*.sql')))
+    return [(os.path.splitext(os.path.basename(path))[0], path) for path in paths]
+
+
+def split_statements(sql):
+    if DOLLAR_QUOTE_PATTERN.search(sql) or any(';' in m.group() for m in STRING_LITERAL_PATTERN.finditer(sql)):
+        raise ValueError("no-transaction migrations are split on ';' and cannot contain dollar-quoted bodies "
+                         "or string literals with semicolons")
+    statements = []
+    for chunk in sql.split(';'):
+        code = [line for line in chunk.splitlines() if line.strip() and not line.strip().startswith('--')]
+        if code:
+            statements.append(chunk.strip())
+    return statements
+
+
+def applied_versions(cursor):
+    cursor.execute(CREATE_MIGRATIONS_TABLE_QUERY)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {version for (version,) in cursor.fetchall()}
+
+
+def drop_invalid_index(cursor, statement):
+    match = CONCURRENT_INDEX_PATTERN.search(statement)
+    if match is None:
+        return
+    cursor.execute(INVALID_INDEX_QUERY, (match.group(1),))
+    row = cursor.fetchone()
+    if row and row[0]:
+        print(f"[!] Dropping invalid index {match.group(1)} left by an interrupted migration")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {match.group(1)}")
+
+
+def apply_migration(conn, version, sql):
+    dbapi_connection = conn.dbapi_connection
+    if NO_TRANSACTION_DIRECTIVE in sql:
+        dbapi_connection.autocommit = True
+        try:
+            with dbapi_connection.cursor() as cursor:
+                for statement in split_statements(sql):
+                    drop_invalid_index(cursor, statement)
+                    cursor.execute(statement)
+                cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+        finally:
+            dbapi_connection.autocommit = False
+    else:
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(sql)
+            cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+        dbapi_connection.commit()
+
+
+def apply_migrations(engine, migrations_dir=MIGRATIONS_DIR, dry_run=False):
+    conn = engine.raw_connection()
+    applied = []
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_ID,))
+        try:
+            done = applied_versions(cursor)
+            conn.commit()
+            for version, path in migration_files(migrations_dir):
+                if version in done:
+                    continue
+                if not dry_run:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        apply_migration(conn, version, f.read())
+                    print(f"[✓] Applied migration {version}")
+                applied.append(version)
+        finally:
+            conn.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_ID,))
+            conn.commit()
+            cursor.close()
+    finally:
+        conn.close()
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply pending database migrations in version order.')
+    parser.add_argument('--migrations-dir', default=MIGRATIONS_DIR)
+    parser.add_argument('--dry-run', action='store_true', help='Only list the migrations that would be applied')
+    args = parser.parse_args()
+
+    load_dotenv()
+    engine = create_pool_engine(pool_size=1, max_overflow=0)
+    applied = apply_migrations(engine, args.migrations_dir, dry_run=args.dry_run)
+    if not applied:
+        print("[✓] Database schema is up to date")
+    elif args.dry_run:
+        print(f"[*] Pending migrations: {', '.join(applied)}")
+
+
+if __name__ == '__main__':
+    main()
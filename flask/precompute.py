@@ -0,0 +1,227 @@
+import os
+import json
+import argparse
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+from ranking import (
+    FEATURE_COLUMNS, MODEL_DIR, RANKING_CHUNK_SIZE, RankingModel, latest_version, weighted_scores, rank_chunks,
+    assemble_recommendations
+)
+from db_pool import create_pool_engine
+from price_history import with_deal_signals
+from similarity import SIMILARITY_DIR, SimilarityIndex, content_rerank, latest_version as latest_index_version
+
+PRECOMPUTE_WORKERS = int(os.environ.get('PRECOMPUTE_WORKERS', os.cpu_count() or 1))
+CANDIDATES_PER_CATEGORY = 20
+WRITE_BATCH_SIZE = 1000
+
+PRODUCT_FIELDS = [
+    'product_name', 'discounted_price', 'actual_price', 'discount_percentage', 'rating',
+    'rating_count', 'about_product', 'category_name', 'product_link'
+]
+
+ALL_USER_CATEGORIES_QUERY = "SELECT user_id, category_id FROM user_preferences"
+USER_CATEGORIES_QUERY = "SELECT user_id, category_id FROM user_preferences WHERE user_id = ANY(%s)"
+CATALOG_VERSIONS_QUERY = "SELECT category_id, version FROM catalog_versions"
+
+CATEGORY_FEATURES_QUERY = f"""
+SELECT product_id, {', '.join(FEATURE_COLUMNS)} FROM products
+WHERE category_id = %s AND discount_percentage > 0
+"""
+
+CATEGORY_BOUNDS_QUERY = f"""
+SELECT max(discounted_price), max(rating_count) FROM products
+WHERE category_id = %s AND discount_percentage > 0 AND {' AND '.join(f'{column} IS NOT NULL' for column in FEATURE_COLUMNS)}
+"""
+
+PRODUCT_DETAILS_QUERY = """
+SELECT p.product_id, p.product_name, p.discounted_price, p.actual_price, p.discount_percentage, p.rating,
+       p.rating_count, p.about_product, COALESCE(c.name, ''), p.product_link
+FROM products p
+LEFT JOIN categories c ON c.id = p.category_id
+WHERE p.product_id = ANY(%s)
+"""
+
+PRICE_STATS_QUERY = """
+SELECT product_id, current_price, previous_price, changed_at, min_price_30d FROM price_stats
+WHERE product_id = ANY(%s)
+"""
+
+UPSERT_RECOMMENDATIONS_QUERY = """
+INSERT INTO user_recommendations (user_id, category_key, fingerprint, recommendations, computed_at)
+VALUES %s
+ON CONFLICT (user_id) DO UPDATE SET
+    category_key = EXCLUDED.category_key,
+    fingerprint = EXCLUDED.fingerprint,
+    recommendations = EXCLUDED.recommendations,
+    computed_at = EXCLUDED.computed_at
+"""
+
+_engine = None
+_model = None
+
+
+def category_key(category_ids):
+    return ','.join(str(category_id) for category_id in sorted(set(category_ids)))
+
+
+def recommendation_fingerprint(category_ids, versions, model_version, index_version=None):
+    catalog = ','.join(f'{category_id}:{versions.get(category_id, 0)}' for category_id in sorted(set(category_ids)))
+    return f"{catalog}|{model_version or 'weighted'}|{index_version or 'text-off'}"
+
+
+def group_users(preferences):
+    categories = defaultdict(set)
+    for user_id, category_id in preferences:
+        categories[user_id].add(category_id)
+    groups = defaultdict(list)
+    for user_id, category_ids in categories.items():
+        groups[tuple(sorted(category_ids))].append(user_id)
+    return groups
+
+
+def init_worker(model_dir, version):
+    global _engine, _model
+    load_dotenv()
+    _engine = create_pool_engine(pool_size=1, max_overflow=0)
+    _model = RankingModel.load(version, model_dir) if version else None
+
+
+def score_category(category_id):
+    conn = _engine.raw_connection()
+    try:
+        transform = None
+        if _model is not None:
+            transform, predict = _model.transform, _model.predict_scaled
+        else:
+            with conn.cursor() as cursor:
+                cursor.execute(CATEGORY_BOUNDS_QUERY, (category_id,))
+                max_price, max_rating_count = cursor.fetchone()
+            if max_price is None:
+                return category_id, []
+            predict = lambda X: weighted_scores(X, max_price, max_rating_count)
+
+        with conn.cursor(name=f'category_features_{category_id}') as cursor:
+            cursor.itersize = RANKING_CHUNK_SIZE
+            cursor.execute(CATEGORY_FEATURES_QUERY, (category_id,))
+            product_ids, predictions = rank_chunks(
+                iter(lambda: cursor.fetchmany(RANKING_CHUNK_SIZE), []), predict, CANDIDATES_PER_CATEGORY, transform
+            )
+        if not len(product_ids):
+            return category_id, []
+
+        with conn.cursor() as cursor:
+            cursor.execute(PRODUCT_DETAILS_QUERY, (product_ids.tolist(),))
+            details = {row[0]: {'product_id': row[0], **dict(zip(PRODUCT_FIELDS, row[1:]))} for row in cursor.fetchall()}
+            cursor.execute(PRICE_STATS_QUERY, (product_ids.tolist(),))
+            stats = {row[0]: row[1:] for row in cursor.fetchall()}
+        return category_id, with_deal_signals(
+            [(float(score), product_id, details[product_id]) for product_id, score in zip(product_ids, predictions)], stats
+        )
+    finally:
+        conn.close()
+
+
+def write_recommendations(rows):
+    conn = _engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            execute_values(cursor, UPSERT_RECOMMENDATIONS_QUERY, rows, template="(%s, %s, %s, %s::jsonb, now())")
+        conn.commit()
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def precompute(engine, user_ids=None, workers=PRECOMPUTE_WORKERS, model_dir=MODEL_DIR, similarity_dir=SIMILARITY_DIR):
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            if user_ids is None:
+                cursor.execute(ALL_USER_CATEGORIES_QUERY)
+            else:
+                cursor.execute(USER_CATEGORIES_QUERY, (list(user_ids),))
+            preferences = cursor.fetchall()
+            cursor.execute(CATALOG_VERSIONS_QUERY)
+            versions = dict(cursor.fetchall())
+    finally:
+        conn.close()
+
+    groups = group_users(preferences)
+    categories = sorted({category_id for category_ids in groups for category_id in category_ids})
+    version = latest_version(model_dir)
+    index_version = latest_index_version(similarity_dir)
+    index = SimilarityIndex.load(index_version, similarity_dir) if index_version else None
+    summary = {
+        'users': sum(len(users) for users in groups.values()),
+        'category_sets': len(groups),
+        'categories': len(categories),
+        'model_version': version,
+        'index_version': index_version,
+        'written': 0
+    }
+    if not groups:
+        return summary
+
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(categories))),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker,
+        initargs=(model_dir, version)
+    ) as executor:
+        candidates = dict(executor.map(score_category, categories))
+
+        rows = []
+        for category_ids, users in groups.items():
+            recommendations = assemble_recommendations(
+                [candidates[category_id] for category_id in category_ids],
+                rerank=lambda top: content_rerank(top, index)
+            )
+            if recommendations is None:
+                continue
+            payload = json.dumps(recommendations)
+            key = category_key(category_ids)
+            fingerprint = recommendation_fingerprint(category_ids, versions, version, index_version)
+            rows.extend((user_id, key, fingerprint, payload) for user_id in users)
+
+        batches = [rows[i:i + WRITE_BATCH_SIZE] for i in range(0, len(rows), WRITE_BATCH_SIZE)]
+        summary['written'] = sum(executor.map(write_recommendations, batches))
+    return summary
+
+
+def parse_user_ids(value):
+    return [int(user_id) for user_id in value.replace(',', ' ').split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute recommendations for many users, scoring each distinct category set once.')
+    parser.add_argument('--user-ids', type=parse_user_ids, help='Comma separated user ids (default: every user with preferences)')
+    parser.add_argument('--users-file', help='File with one user id per line')
+    parser.add_argument('--workers', type=int, default=PRECOMPUTE_WORKERS)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    user_ids = args.user_ids
+    if args.users_file:
+        with open(args.users_file, 'r', encoding='utf-8') as f:
+            user_ids = (user_ids or []) + parse_user_ids(f.read())
+
+    load_dotenv()
+    engine = create_pool_engine(pool_size=1, max_overflow=0)
+    if not args.json:
+        print("[🚀] Precomputing recommendations...")
+    summary = precompute(engine, user_ids, workers=args.workers, model_dir=args.model_dir)
+    if args.json:
+        print(json.dumps(summary))
+        return
+    print(f"[✓] {summary['written']} users updated from {summary['category_sets']} distinct category sets "
+          f"over {summary['categories']} categories (model {summary['model_version'] or 'weighted'})")
+
+
+if __name__ == '__main__':
+    main()
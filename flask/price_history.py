@@ -0,0 +1,130 @@
+import os
+from datetime import datetime, timedelta
+from psycopg2.extras import execute_values
+
+from catalog import bump_catalog_versions
+
+PRICE_WINDOW_DAYS = int(os.environ.get('PRICE_WINDOW_DAYS', 30))
+RECENT_DROP_DAYS = int(os.environ.get('RECENT_DROP_DAYS', 7))
+DEAL_WEIGHT = float(os.environ.get('DEAL_WEIGHT', 0.1))
+MAX_DROP_PERCENTAGE = 50.0
+
+RECORD_PRICES_QUERY = """
+INSERT INTO price_history (product_id, observed_at, price)
+SELECT product_id, observed_at, price FROM (
+    SELECT
+        i.product_id, i.observed_at, i.price,
+        coalesce(lag(i.price) OVER (PARTITION BY i.product_id ORDER BY i.observed_at), s.current_price) AS prior_price
+    FROM (VALUES %s) AS i (product_id, observed_at, price)
+    JOIN products p ON p.product_id = i.product_id
+    LEFT JOIN price_stats s ON s.product_id = i.product_id
+    WHERE s.product_id IS NULL OR i.observed_at > s.changed_at
+) AS observed
+WHERE prior_price IS DISTINCT FROM price
+ON CONFLICT DO NOTHING
+RETURNING product_id
+"""
+
+REFRESH_STATS_QUERY = """
+WITH history AS (
+    SELECT
+        product_id, observed_at, price,
+        lag(price) OVER w AS previous_price,
+        lead(observed_at) OVER w AS next_observed_at,
+        row_number() OVER (PARTITION BY product_id ORDER BY observed_at DESC) AS recency,
+        count(*) OVER (PARTITION BY product_id) AS changes
+    FROM price_history
+    WHERE product_id = ANY(%(product_ids)s)
+    WINDOW w AS (PARTITION BY product_id ORDER BY observed_at)
+),
+minimum AS (
+    SELECT DISTINCT ON (product_id)
+        product_id, price AS min_price,
+        next_observed_at + make_interval(days => %(window_days)s) AS expires_at
+    FROM history
+    WHERE next_observed_at IS NULL OR next_observed_at > now() - make_interval(days => %(window_days)s)
+    ORDER BY product_id, price, next_observed_at DESC NULLS FIRST
+)
+INSERT INTO price_stats (product_id, current_price, previous_price, changed_at, min_price_30d, min_expires_at, changes)
+SELECT h.product_id, h.price, h.previous_price, h.observed_at, m.min_price, m.expires_at, h.changes
+FROM history h
+JOIN minimum m ON m.product_id = h.product_id
+WHERE h.recency = 1
+ON CONFLICT (product_id) DO UPDATE SET
+    current_price = EXCLUDED.current_price,
+    previous_price = EXCLUDED.previous_price,
+    changed_at = EXCLUDED.changed_at,
+    min_price_30d = EXCLUDED.min_price_30d,
+    min_expires_at = EXCLUDED.min_expires_at,
+    changes = EXCLUDED.changes
+"""
+
+EXPIRED_STATS_QUERY = """
+SELECT s.product_id, p.category_id FROM price_stats s
+JOIN products p ON p.product_id = s.product_id
+WHERE s.min_expires_at < now()
+"""
+
+
+def refresh_price_stats(cursor, product_ids):
+    product_ids = sorted(set(product_ids))
+    if product_ids:
+        cursor.execute(REFRESH_STATS_QUERY, {'product_ids': product_ids, 'window_days': PRICE_WINDOW_DAYS})
+    return len(product_ids)
+
+
+def record_prices(cursor, observations):
+    observations = [observation for observation in observations if observation[2] is not None]
+    if not observations:
+        return 0
+    changed = execute_values(
+        cursor, RECORD_PRICES_QUERY, observations,
+        template="(%s, %s::timestamptz, %s::float)", page_size=len(observations), fetch=True
+    )
+    refresh_price_stats(cursor, [product_id for (product_id,) in changed])
+    return len(changed)
+
+
+def refresh_expired_stats(cursor):
+    cursor.execute(EXPIRED_STATS_QUERY)
+    expired = cursor.fetchall()
+    refreshed = refresh_price_stats(cursor, [product_id for product_id, _ in expired])
+    bump_catalog_versions(cursor, [category_id for _, category_id in expired])
+    return refreshed
+
+
+def deal_signals(current_price=None, previous_price=None, changed_at=None, min_price_30d=None, now=None):
+    signals = {'min_price_30d': min_price_30d, 'price_drop_percentage': 0.0, 'is_30d_low': False}
+    if previous_price is None or current_price is None:
+        return signals
+    now = now or datetime.utcnow()
+    if current_price < previous_price and now - changed_at <= timedelta(days=RECENT_DROP_DAYS):
+        signals['price_drop_percentage'] = round((previous_price - current_price) / previous_price * 100, 1)
+    signals['is_30d_low'] = current_price <= min_price_30d
+    return signals
+
+
+def deal_boost(signals):
+    drop = min(signals['price_drop_percentage'], MAX_DROP_PERCENTAGE) / MAX_DROP_PERCENTAGE
+    return DEAL_WEIGHT * (drop + float(signals['is_30d_low'])) / 2
+
+
+def with_current_price(product, current_price):
+    actual_price = product.get('actual_price')
+    discount_percentage = product.get('discount_percentage')
+    if actual_price:
+        discount_percentage = round(max(actual_price - current_price, 0.0) / actual_price * 100, 1)
+    return {**product, 'discounted_price': current_price, 'discount_percentage': discount_percentage}
+
+
+def with_deal_signals(candidates, stats, now=None):
+    now = now or datetime.utcnow()
+    boosted = []
+    for score, product_id, product in candidates:
+        product_stats = stats.get(product_id, ())
+        signals = deal_signals(*product_stats, now=now)
+        if product_stats:
+            product = with_current_price(product, product_stats[0])
+        boosted.append((score + deal_boost(signals), {**product, **signals}))
+    boosted.sort(key=lambda candidate: candidate[0], reverse=True)
+    return boosted
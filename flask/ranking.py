@@ -0,0 +1,297 @@
+import os
+import time
+import heapq
+from itertools import islice
+import numpy as np
+from instrumentation import span
+from artifacts import ArtifactStore, latest_version as latest_artifact_version, new_version, publish
+
+MODEL_DIR = os.environ.get(
+    'MODEL_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models', 'ranker')
+)
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 30))
+EXPORT_TOLERANCE = float(os.environ.get('EXPORT_TOLERANCE', 1e-4))
+RANKING_CHUNK_SIZE = int(os.environ.get('RANKING_CHUNK_SIZE', 5000))
+
+FEATURE_COLUMNS = ['discounted_price', 'actual_price', 'discount_percentage', 'rating', 'rating_count']
+
+DISCOUNT_WEIGHT = 0.35
+RATING_WEIGHT = 0.35
+PRICE_WEIGHT = 0.15
+RATING_COUNT_WEIGHT = 0.15
+
+
+def weighted_scores(X, max_price=None, max_rating_count=None):
+    if max_price is None:
+        max_price = np.max(X[:, 0]) if len(X) > 0 else 1
+    normalized_prices = 1 - (X[:, 0] / max_price)
+    log_counts = np.log1p(X[:, 4])
+    if max_rating_count is not None:
+        max_log_count = np.log1p(max_rating_count)
+    else:
+        max_log_count = np.max(log_counts) if len(X) > 0 else 0
+    if max_log_count <= 0:
+        max_log_count = 1
+    return (
+        PRICE_WEIGHT * normalized_prices +
+        DISCOUNT_WEIGHT * (X[:, 2] / 100) +
+        RATING_WEIGHT * (X[:, 3] / 5) +
+        RATING_COUNT_WEIGHT * (log_counts / max_log_count)
+    )
+
+
+def top_k_indices(scores, k):
+    if len(scores) > k:
+        top = np.argpartition(scores, -k)[-k:]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(scores[top], kind='stable')[::-1]]
+
+
+class TopK:
+    def __init__(self, k):
+        self.k = k
+        self.keys = np.empty(0, dtype=object)
+        self.scores = np.empty(0, dtype=np.float64)
+
+    def push(self, keys, scores):
+        keys = np.concatenate([self.keys, keys])
+        scores = np.concatenate([self.scores, scores])
+        top = top_k_indices(scores, self.k)
+        self.keys, self.scores = keys[top], scores[top]
+
+
+def rank_chunks(chunks, predict, k, transform=None):
+    top = TopK(k)
+    chunks = iter(chunks)
+    while True:
+        with span('feature_fetch'):
+            rows = next(chunks, None)
+        if not rows:
+            break
+        with span('feature_build'):
+            columns = list(zip(*rows))
+            product_ids = np.array(columns[0], dtype=object)
+            X = np.array(columns[1:], dtype=np.float64).T
+            complete = ~np.isnan(X).any(axis=1)
+        if not complete.any():
+            continue
+        X = X[complete]
+        if transform is not None:
+            with span('scale'):
+                X = transform(X)
+        with span('predict'):
+            scores = predict(X)
+        top.push(product_ids[complete], scores)
+    return top.keys, top.scores
+
+
+def merge_candidates(candidate_lists, limit=20):
+    return list(islice(
+        heapq.merge(*candidate_lists, key=lambda candidate: candidate[0], reverse=True),
+        limit
+    ))
+
+
+def diversify(prices, k=5, max_per_bucket=2, bucket_size=500):
+    buckets = (np.asarray(prices, dtype=np.float64) / bucket_size).astype(np.int64)
+    order = np.argsort(buckets, kind='stable')
+    sorted_buckets = buckets[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(buckets)]))
+    occurrence = np.empty(len(buckets), dtype=np.int64)
+    occurrence[order] = np.arange(len(buckets)) - group_start
+
+    eligible = np.flatnonzero(occurrence < max_per_bucket)[:k]
+    if len(eligible) < k:
+        remaining = np.flatnonzero(occurrence >= max_per_bucket)[:k - len(eligible)]
+        eligible = np.concatenate([eligible, remaining])
+    return eligible
+
+
+def assemble_recommendations(candidate_lists, k=5, rerank=None):
+    top_candidates = merge_candidates(candidate_lists, limit=20)
+    if not top_candidates:
+        return None
+    if rerank is not None:
+        top_candidates = rerank(top_candidates)
+    prices = np.array([product['discounted_price'] for _, product in top_candidates])
+    return [top_candidates[i][1] for i in diversify(prices, k=k, max_per_bucket=2)]
+
+
+def build_model(input_dim):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Dropout, BatchNormalization
+    from tensorflow.keras.optimizers import Adam
+
+    model = Sequential([
+        Dense(128, input_dim=input_dim, activation='relu'),
+        BatchNormalization(),
+        Dropout(0.3),
+        Dense(64, activation='relu'),
+        BatchNormalization(),
+        Dropout(0.2),
+        Dense(32, activation='relu'),
+        Dense(1, activation='sigmoid')
+    ])
+    model.compile(
+        optimizer=Adam(learning_rate=0.001),
+        loss='mean_squared_error'
+    )
+    return model
+
+
+def fit_model(X_scaled, targets, epochs=100):
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    model = build_model(X_scaled.shape[1])
+    early_stopping = EarlyStopping(monitor='loss', patience=20, restore_best_weights=True)
+    model.fit(
+        X_scaled,
+        targets,
+        epochs=epochs,
+        batch_size=min(32, len(X_scaled)),
+        callbacks=[early_stopping],
+        verbose=0
+    )
+    return model
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'sigmoid': lambda x: 0.5 * (1.0 + np.tanh(0.5 * x))
+}
+
+
+class NumpyMLP:
+    def __init__(self, weights, biases, activations):
+        self.weights = [np.asarray(w, dtype=np.float64) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float64) for b in biases]
+        self.activations = list(activations)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            activations = [str(a) for a in data['activations']]
+            return cls(
+                [data[f'w{i}'] for i in range(len(activations))],
+                [data[f'b{i}'] for i in range(len(activations))],
+                activations
+            )
+
+    def save(self, path):
+        arrays = {'activations': np.array(self.activations)}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f'w{i}'] = w
+            arrays[f'b{i}'] = b
+        np.savez(path, **arrays)
+
+    def predict(self, X):
+        out = np.asarray(X, dtype=np.float64)
+        for w, b, activation in zip(self.weights, self.biases, self.activations):
+            out = ACTIVATIONS[activation](out @ w + b)
+        return out.reshape(len(out), -1)[:, 0]
+
+
+def export_mlp(model):
+    weights, biases, activations = [], [], []
+    scale, shift = None, None
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == 'Dropout':
+            continue
+        if kind == 'BatchNormalization':
+            gamma, beta, mean, variance = layer.get_weights()
+            layer_scale = gamma / np.sqrt(variance + layer.epsilon)
+            layer_shift = beta - mean * layer_scale
+            if scale is None:
+                scale, shift = layer_scale, layer_shift
+            else:
+                scale, shift = scale * layer_scale, shift * layer_scale + layer_shift
+            continue
+        if kind != 'Dense':
+            raise ValueError(f"Cannot export layer {layer.name} of type {kind}")
+        w, b = layer.get_weights()
+        if scale is not None:
+            b = b + shift @ w
+            w = scale[:, None] * w
+            scale, shift = None, None
+        activation = layer.get_config()['activation']
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation {activation} in layer {layer.name}")
+        weights.append(w)
+        biases.append(b)
+        activations.append(activation)
+    if scale is not None:
+        weights.append(np.diag(scale))
+        biases.append(shift)
+        activations.append('linear')
+    return NumpyMLP(weights, biases, activations)
+
+
+def validate_export(model, mlp, X_scaled, tolerance=EXPORT_TOLERANCE):
+    expected = model.predict(X_scaled, verbose=0).flatten()
+    error = float(np.max(np.abs(expected - mlp.predict(X_scaled)))) if len(X_scaled) else 0.0
+    if error > tolerance:
+        raise ValueError(f"NumPy export differs from Keras by {error:.2e} (tolerance {tolerance:.0e})")
+    return error
+
+
+def save_artifact(model, scaler, n_samples, model_dir=MODEL_DIR, mlp=None):
+    version = new_version()
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    model.save(os.path.join(version_dir, 'model.keras'))
+    if mlp is not None:
+        mlp.save(os.path.join(version_dir, 'weights.npz'))
+    np.savez(os.path.join(version_dir, 'scaler.npz'), mean=scaler.mean_, scale=scaler.scale_)
+    publish(version_dir, model_dir, {
+        'version': version,
+        'features': FEATURE_COLUMNS,
+        'n_samples': int(n_samples),
+        'trained_at': time.time()
+    })
+    return version
+
+
+def latest_version(model_dir=MODEL_DIR):
+    return latest_artifact_version(model_dir)
+
+
+class RankingModel:
+    def __init__(self, version, model, mean, scale):
+        self.version = version
+        self.model = model
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def load(cls, version, model_dir=MODEL_DIR):
+        version_dir = os.path.join(model_dir, version)
+        weights_path = os.path.join(version_dir, 'weights.npz')
+        if os.path.exists(weights_path):
+            model = NumpyMLP.load(weights_path)
+        else:
+            from tensorflow.keras.models import load_model
+            model = load_model(os.path.join(version_dir, 'model.keras'))
+        scaler = np.load(os.path.join(version_dir, 'scaler.npz'))
+        return cls(version, model, scaler['mean'], scaler['scale'])
+
+    def transform(self, X):
+        return (X - self.mean) / self.scale
+
+    def predict_scaled(self, X_scaled):
+        if isinstance(self.model, NumpyMLP):
+            return self.model.predict(X_scaled)
+        return self.model.predict(X_scaled, verbose=0).flatten()
+
+    def predict(self, X):
+        return self.predict_scaled(self.transform(X))
+
+
+class ModelStore(ArtifactStore):
+    def __init__(self, model_dir=MODEL_DIR, reload_interval=MODEL_RELOAD_INTERVAL):
+        super().__init__(model_dir, RankingModel.load, 'ranking model', reload_interval)
@@ -0,0 +1,24 @@
+import os
+
+from ttl_cache import TTLCache
+
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.environ.get('RECOMMENDATION_CACHE_MAX_ENTRIES', 5000))
+RECOMMENDATION_CACHE_TTL = float(os.environ.get('RECOMMENDATION_CACHE_TTL', 600))
+
+
+class RecommendationCache(TTLCache):
+    def __init__(self, max_entries=RECOMMENDATION_CACHE_MAX_ENTRIES, ttl=RECOMMENDATION_CACHE_TTL):
+        super().__init__(ttl, max_entries=max_entries)
+
+    def get(self, category_ids, fingerprint):
+        return self._get(category_ids, fingerprint)
+
+    def put(self, category_ids, fingerprint, recommendations):
+        self._put(category_ids, recommendations, fingerprint)
+
+    def invalidate(self, category_ids=None):
+        if category_ids is None:
+            self._invalidate()
+        else:
+            category_ids = set(category_ids)
+            self._invalidate(lambda key, _: not category_ids.isdisjoint(key))
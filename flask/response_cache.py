@@ -0,0 +1,35 @@
+import os
+import hashlib
+from datetime import datetime, timezone
+
+from ttl_cache import TTLCache
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 10_000))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 3600))
+PUBLIC_MAX_AGE = int(os.environ.get('RESPONSE_CACHE_PUBLIC_MAX_AGE', 60))
+
+
+class CachedPage:
+    def __init__(self, body, mimetype, tags):
+        self.body = body
+        self.mimetype = mimetype
+        self.tags = frozenset(tags)
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class ResponseCache(TTLCache):
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL):
+        super().__init__(ttl, max_entries=max_entries)
+
+    def get(self, key):
+        return self._get(key)
+
+    def put(self, key, body, tags=(), mimetype='text/html'):
+        page = CachedPage(body, mimetype, tags)
+        self._put(key, page)
+        return page
+
+    def invalidate(self, *tags):
+        tags = set(tags)
+        self._invalidate(lambda _, page: not page.tags.isdisjoint(tags))
@@ -0,0 +1,57 @@
+import numpy as np
+from psycopg2.extras import execute_values
+
+from ranking import FEATURE_COLUMNS
+
+SCORES_TABLE = 'product_scores'
+
+UPSERT_SCORES_QUERY = f"""
+INSERT INTO {SCORES_TABLE} (product_id, category_id, score, model_version, updated_at)
+VALUES %s
+ON CONFLICT (product_id) DO UPDATE SET
+    category_id = EXCLUDED.category_id,
+    score = EXCLUDED.score,
+    model_version = EXCLUDED.model_version,
+    updated_at = EXCLUDED.updated_at
+"""
+
+RANKABLE_PRODUCTS_QUERY = f"""
+SELECT product_id, category_id, {', '.join(FEATURE_COLUMNS)} FROM products
+WHERE discount_percentage > 0
+"""
+
+
+def is_rankable(features):
+    return None not in features and features[2] > 0
+
+
+def write_scores(cursor, model, rows):
+    rows = [row for row in rows if is_rankable(row[2])]
+    if model is None or not rows:
+        return 0
+
+    X = np.array([row[2] for row in rows], dtype=np.float64)
+    predictions = model.predict(X)
+    execute_values(
+        cursor,
+        UPSERT_SCORES_QUERY,
+        [(product_id, category_id, float(score), model.version)
+         for (product_id, category_id, _), score in zip(rows, predictions)],
+        template="(%s, %s, %s, %s, now())"
+    )
+    return len(rows)
+
+
+def rescore_all(conn, model, batch_size=5000):
+    total = 0
+    with conn.cursor(name='rescore_products') as reader, conn.cursor() as writer:
+        reader.itersize = batch_size
+        reader.execute(RANKABLE_PRODUCTS_QUERY)
+        while True:
+            batch = reader.fetchmany(batch_size)
+            if not batch:
+                break
+            total += write_scores(writer, model, [(row[0], row[1], row[2:]) for row in batch])
+        writer.execute(f"DELETE FROM {SCORES_TABLE} WHERE model_version <> %s", (model.version,))
+    conn.commit()
+    return total
@@ -0,0 +1,291 @@
+import os
+import time
+import argparse
+import threading
+from itertools import groupby
+import numpy as np
+from dotenv import load_dotenv
+
+from artifacts import ArtifactStore, latest_version as latest_artifact_version, load_meta, new_version, publish
+from ranking import top_k_indices
+
+SIMILARITY_DIR = os.environ.get(
+    'SIMILARITY_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models', 'similarity')
+)
+SIMILARITY_RELOAD_INTERVAL = float(os.environ.get('SIMILARITY_RELOAD_INTERVAL', 30))
+VECTOR_DIM = 64
+HASH_FEATURES = 2 ** 18
+FIT_SAMPLE = 100_000
+BATCH_SIZE = 10_000
+PROBES = int(os.environ.get('SIMILARITY_PROBES', 8))
+RERANK_DIVERSITY = float(os.environ.get('RERANK_DIVERSITY', 0.3))
+
+PRODUCT_TEXT_QUERY = """
+SELECT product_id, category_id, COALESCE(product_name, ''), COALESCE(about_product, '') FROM products
+WHERE category_id IS NOT NULL
+ORDER BY category_id, product_id
+"""
+
+SAMPLE_TEXT_QUERY = """
+SELECT COALESCE(product_name, '') || ' ' || COALESCE(about_product, '') FROM products
+ORDER BY random()
+LIMIT %s
+"""
+
+
+def product_texts(engine, batch_size=BATCH_SIZE):
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor(name='similarity_products') as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(PRODUCT_TEXT_QUERY)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+    finally:
+        conn.close()
+
+
+class TextEncoder:
+    def __init__(self, dim=VECTOR_DIM, n_features=HASH_FEATURES):
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+        from sklearn.decomposition import TruncatedSVD
+
+        self.hasher = HashingVectorizer(
+            n_features=n_features, alternate_sign=False, norm=None, stop_words='english', ngram_range=(1, 2)
+        )
+        self.tfidf = TfidfTransformer(sublinear_tf=True)
+        self.svd = TruncatedSVD(n_components=dim, algorithm='randomized', random_state=42)
+
+    def fit(self, texts):
+        counts = self.hasher.transform(texts)
+        self.svd.fit(self.tfidf.fit_transform(counts))
+        return self
+
+    def transform(self, texts):
+        vectors = self.svd.transform(self.tfidf.transform(self.hasher.transform(texts))).astype(np.float32)
+        return normalize(vectors)
+
+
+def normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def list_count(n):
+    return max(1, int(np.sqrt(n)))
+
+
+def build_category(vectors, product_ids, directory):
+    from sklearn.cluster import MiniBatchKMeans
+
+    n_lists = list_count(len(vectors))
+    if n_lists > 1:
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, batch_size=4096, n_init=3, random_state=42).fit(vectors)
+        assignments = kmeans.labels_
+        centroids = normalize(kmeans.cluster_centers_.astype(np.float32))
+    else:
+        assignments = np.zeros(len(vectors), dtype=np.int64)
+        centroids = normalize(vectors.mean(axis=0, keepdims=True))
+
+    order = np.argsort(assignments, kind='stable')
+    offsets = np.searchsorted(assignments[order], np.arange(n_lists + 1)).astype(np.int64)
+    ids = np.array([product_id.encode('utf-8') for product_id in product_ids], dtype=bytes)[order]
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, 'vectors.npy'), np.ascontiguousarray(vectors[order], dtype=np.float32))
+    np.save(os.path.join(directory, 'ids.npy'), ids)
+    np.save(os.path.join(directory, 'centroids.npy'), centroids)
+    np.save(os.path.join(directory, 'offsets.npy'), offsets)
+    return ids
+
+
+def write_lookup(version_dir, category_ids):
+    ids, categories, rows = [], [], []
+    for category_id, category_product_ids in category_ids.items():
+        ids.append(category_product_ids)
+        categories.append(np.full(len(category_product_ids), category_id, dtype=np.int32))
+        rows.append(np.arange(len(category_product_ids), dtype=np.int32))
+    ids = np.concatenate(ids) if ids else np.empty(0, dtype=bytes)
+    order = np.argsort(ids, kind='stable')
+    np.save(os.path.join(version_dir, 'lookup_ids.npy'), ids[order])
+    np.save(os.path.join(version_dir, 'lookup_categories.npy'), np.concatenate(categories)[order] if categories else np.empty(0, dtype=np.int32))
+    np.save(os.path.join(version_dir, 'lookup_rows.npy'), np.concatenate(rows)[order] if rows else np.empty(0, dtype=np.int32))
+
+
+def sample_texts(engine, limit):
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SAMPLE_TEXT_QUERY, (limit,))
+            return [text for (text,) in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def build_index(engine, model_dir=SIMILARITY_DIR, dim=VECTOR_DIM, fit_sample=FIT_SAMPLE):
+    sample = sample_texts(engine, fit_sample)
+    if not sample:
+        return None
+    encoder = TextEncoder(dim=min(dim, max(1, len(sample) - 1))).fit(sample)
+
+    version = new_version()
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    category_ids = {}
+    current, ids, vectors = None, [], []
+
+    def flush():
+        if current is not None and ids:
+            category_ids[current] = build_category(
+                np.concatenate(vectors), ids, os.path.join(version_dir, str(current))
+            )
+
+    for batch in product_texts(engine):
+        for category_id, rows in groupby(batch, key=lambda row: row[1]):
+            rows = list(rows)
+            if category_id != current:
+                flush()
+                current, ids, vectors = category_id, [], []
+            ids.extend(row[0] for row in rows)
+            vectors.append(encoder.transform([f'{name} {about}' for _, _, name, about in rows]))
+    flush()
+
+    write_lookup(version_dir, category_ids)
+    publish(version_dir, model_dir, {
+        'version': version,
+        'dim': int(encoder.svd.n_components),
+        'products': int(sum(len(ids) for ids in category_ids.values())),
+        'categories': sorted(int(category_id) for category_id in category_ids),
+        'built_at': time.time()
+    })
+    return version
+
+
+def latest_version(model_dir=SIMILARITY_DIR):
+    return latest_artifact_version(model_dir)
+
+
+class CategoryIndex:
+    def __init__(self, directory):
+        self.vectors = np.load(os.path.join(directory, 'vectors.npy'), mmap_mode='r')
+        self.ids = np.load(os.path.join(directory, 'ids.npy'), mmap_mode='r')
+        self.centroids = np.load(os.path.join(directory, 'centroids.npy'))
+        self.offsets = np.load(os.path.join(directory, 'offsets.npy'))
+
+    def search(self, query, k, probes=PROBES, exclude=None):
+        lists = top_k_indices(self.centroids @ query, probes)
+        rows = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists])
+        scores = np.concatenate([self.vectors[self.offsets[i]:self.offsets[i + 1]] @ query for i in lists])
+        if exclude is not None:
+            keep = rows != exclude
+            rows, scores = rows[keep], scores[keep]
+        top = top_k_indices(scores, k)
+        return rows[top], scores[top]
+
+
+class SimilarityIndex:
+    def __init__(self, version, version_dir):
+        self.version = version
+        self.version_dir = version_dir
+        self.lookup_ids = np.load(os.path.join(version_dir, 'lookup_ids.npy'), mmap_mode='r')
+        self.lookup_categories = np.load(os.path.join(version_dir, 'lookup_categories.npy'), mmap_mode='r')
+        self.lookup_rows = np.load(os.path.join(version_dir, 'lookup_rows.npy'), mmap_mode='r')
+        self._categories = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, version, model_dir=SIMILARITY_DIR):
+        return cls(version, os.path.join(model_dir, version))
+
+    def category(self, category_id):
+        index = self._categories.get(category_id)
+        if index is None:
+            with self._lock:
+                index = self._categories.get(category_id)
+                if index is None:
+                    index = CategoryIndex(os.path.join(self.version_dir, str(category_id)))
+                    self._categories[category_id] = index
+        return index
+
+    def locate(self, product_id):
+        key = product_id.encode('utf-8')
+        position = int(np.searchsorted(self.lookup_ids, key))
+        if position >= len(self.lookup_ids) or self.lookup_ids[position] != key:
+            return None
+        return int(self.lookup_categories[position]), int(self.lookup_rows[position])
+
+    def vector(self, product_id):
+        location = self.locate(product_id)
+        if location is None:
+            return None
+        category_id, row = location
+        return np.asarray(self.category(category_id).vectors[row])
+
+    def similar(self, product_id, k=10, probes=PROBES):
+        location = self.locate(product_id)
+        if location is None:
+            return None
+        category_id, row = location
+        index = self.category(category_id)
+        rows, scores = index.search(np.asarray(index.vectors[row]), k, probes=probes, exclude=row)
+        return [(index.ids[i].decode('utf-8'), float(score)) for i, score in zip(rows, scores)]
+
+
+class SimilarityStore(ArtifactStore):
+    def __init__(self, model_dir=SIMILARITY_DIR, reload_interval=SIMILARITY_RELOAD_INTERVAL):
+        super().__init__(model_dir, SimilarityIndex.load, 'similarity index', reload_interval)
+
+
+def content_rerank(candidates, index, diversity=RERANK_DIVERSITY):
+    if index is None or len(candidates) < 2 or diversity <= 0:
+        return candidates
+    vectors = [index.vector(product.get('product_id', '')) for _, product in candidates]
+    if sum(vector is not None for vector in vectors) < 2:
+        return candidates
+
+    scores = np.array([score for score, _ in candidates], dtype=np.float64)
+    spread = scores.max() - scores.min()
+    relevance = (scores - scores.min()) / spread if spread > 0 else np.ones(len(scores))
+    dim = next(vector for vector in vectors if vector is not None).shape[0]
+    matrix = np.stack([vector if vector is not None else np.zeros(dim, dtype=np.float32) for vector in vectors])
+    similarity = matrix @ matrix.T
+
+    selected = []
+    remaining = list(range(len(candidates)))
+    max_similarity = np.zeros(len(candidates))
+    while remaining:
+        marginal = (1 - diversity) * relevance[remaining] - diversity * max_similarity[remaining]
+        best = remaining.pop(int(np.argmax(marginal)))
+        selected.append(best)
+        max_similarity = np.maximum(max_similarity, similarity[best])
+    return [candidates[i] for i in selected]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the per-category product similarity index from product text.')
+    parser.add_argument('--model-dir', default=SIMILARITY_DIR)
+    parser.add_argument('--dim', type=int, default=VECTOR_DIM)
+    parser.add_argument('--fit-sample', type=int, default=FIT_SAMPLE)
+    args = parser.parse_args()
+
+    from db_pool import create_pool_engine
+
+    load_dotenv()
+    engine = create_pool_engine(pool_size=1, max_overflow=0)
+    print("[🚀] Building similarity index from product text...")
+    started = time.perf_counter()
+    version = build_index(engine, model_dir=args.model_dir, dim=args.dim, fit_sample=args.fit_sample)
+    if version is None:
+        print("[!] No products with a category, nothing to index")
+        return
+    meta = load_meta(args.model_dir, version)
+    print(f"[✓] Indexed {meta['products']} products in {len(meta['categories'])} categories "
+          f"as version {version} ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import numpy as np
+from dotenv import load_dotenv
+from sklearn.preprocessing import StandardScaler
+
+from ranking import (
+    FEATURE_COLUMNS, MODEL_DIR, RankingModel, weighted_scores, fit_model, save_artifact, export_mlp, validate_export
+)
+from scores import rescore_all
+from db_pool import create_pool_engine
+
+load_dotenv()
+
+VALIDATION_SAMPLES = 10_000
+
+FEATURES_QUERY = f"""
+SELECT {', '.join(FEATURE_COLUMNS)} FROM products
+WHERE {' AND '.join(f'{column} IS NOT NULL' for column in FEATURE_COLUMNS)}
+"""
+
+
+def load_features(engine):
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(FEATURES_QUERY)
+            rows = cursor.fetchall()
+    finally:
+        conn.close()
+    return np.array(rows, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the product ranking model over the whole products table.')
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--no-rescore', action='store_true', help='Do not refresh product_scores with the new model')
+    args = parser.parse_args()
+
+    print("[🚀] Loading product features...")
+    engine = create_pool_engine(pool_size=1, max_overflow=0)
+    X = load_features(engine)
+    if len(X) == 0:
+        print("[!] No products with complete features, nothing to train on")
+        return
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    targets = weighted_scores(X)
+
+    print(f"[*] Training ranking model on {len(X)} products...")
+    model = fit_model(X_scaled, targets, epochs=args.epochs)
+    mlp = export_mlp(model)
+    error = validate_export(model, mlp, X_scaled[:VALIDATION_SAMPLES])
+    print(f"[✓] Exported NumPy runtime, max deviation from Keras {error:.2e}")
+    version = save_artifact(model, scaler, len(X), model_dir=args.model_dir, mlp=mlp)
+    print(f"[✓] Saved ranking model version {version} to {args.model_dir}")
+
+    if args.no_rescore:
+        return
+    print("[*] Rescoring products with the new model...")
+    ranking_model = RankingModel(version, mlp, scaler.mean_, scaler.scale_)
+    conn = engine.raw_connection()
+    try:
+        scored = rescore_all(conn, ranking_model)
+    finally:
+        conn.close()
+    print(f"[✓] Rescored {scored} products")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, ttl, max_entries=None, max_bytes=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _get(self, key, tag=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, entry_tag, value, _ = entry
+            if entry_tag != tag or expires_at <= time.monotonic():
+                self._remove(key)
+                if entry_tag != tag:
+                    self.invalidations += 1
+                else:
+                    self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _put(self, key, value, tag=None, size=0):
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self._full(size):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (time.monotonic() + self.ttl, tag, value, size)
+            self._bytes += size
+
+    def _invalidate(self, matches=None):
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if matches is None or matches(key, entry[2])]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def _full(self, size):
+        if self.max_entries is not None and len(self._entries) >= self.max_entries:
+            return True
+        return self.max_bytes is not None and self._bytes + size > self.max_bytes
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)[3]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {'entries': len(self._entries)}
+            if self.max_bytes is not None:
+                stats.update(bytes=self._bytes, max_bytes=self.max_bytes)
+            if self.max_entries is not None:
+                stats['max_entries'] = self.max_entries
+            stats.update({
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            })
+            return stats
@@ -1,18 +1,30 @@
 import os
+import sys
+import io
 import csv
-import psycopg2
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+from itertools import chain
 from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
-load_dotenv()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'flask'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webscraping'))
+
+from ranking import ModelStore
+from scores import write_scores
+from catalog import bump_catalog_versions, catalog_identity
+from price_history import record_prices, refresh_expired_stats
+from feature_snapshot import export_snapshot
+from db_pool import create_pool_engine, pool_stats
+from migrate import apply_migrations
+from segments import SEGMENTS_DIR, category_slug, list_categories, list_segments, read_segment, segment_key
 
-DB_CONFIG = {
-    'dbname': os.getenv('POSTGRES_DB', 'postgres'),
-    'user': os.getenv('POSTGRES_USER', 'postgres'),
-    'password': os.getenv('POSTGRES_PASSWORD', 'postgres'),
-    'host': os.getenv('POSTGRES_HOST', 'postgresql'),
-    'port': os.getenv('POSTGRES_PORT', 5432)
-}
+load_dotenv()
 
 TABLE_NAME = 'products'
 CSV_DIR = 'amazon_data'
@@ -21,6 +33,23 @@ CSV_FILES = [
     'beauty_and_personal_care.csv', 'sports_and_outdoors.csv', 'health_and_household.csv',
     'Books.csv', 'Toys_and_Games.csv', 'grocery_and_Gourmet_Food.csv', 'pet_Supplies.csv'
 ]
+SEGMENTS_PATH = os.path.join(CSV_DIR, SEGMENTS_DIR)
+
+PRODUCT_COLUMNS = [
+    'product_id', 'product_name', 'category', 'discounted_price', 'actual_price',
+    'discount_percentage', 'rating', 'rating_count', 'about_product', 'product_link'
+]
+
+INGEST_MODE = os.getenv('INGEST_MODE', 'copy')
+MANIFEST_PATH = os.getenv('INGEST_MANIFEST', os.path.join(CSV_DIR, '.ingest_manifest.json'))
+STAGING_TABLE = 'products_staging'
+INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', 5))
+WATCH_INTERVAL = float(os.getenv('INGEST_WATCH_INTERVAL', 5))
+MAX_SEGMENTS_PER_BATCH = int(os.getenv('INGEST_MAX_SEGMENTS', 50))
+WATCH_MAX_BACKOFF = float(os.getenv('INGEST_WATCH_MAX_BACKOFF', 300))
+EXPIRED_STATS_INTERVAL = float(os.getenv('EXPIRED_STATS_INTERVAL', 300))
+BACKLOG = 'backlog'
+FAILED = 'failed'
 
 INSERT_QUERY = f"""
 INSERT INTO {TABLE_NAME} (
@@ -28,137 +57,473 @@ INSERT INTO {TABLE_NAME} (
     discount_percentage, rating, rating_count, about_product, product_link, category_id
 ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
 ON CONFLICT (product_id) DO NOTHING
+RETURNING product_id
+"""
+
+CREATE_STAGING_QUERY = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (LIKE {TABLE_NAME} INCLUDING DEFAULTS) ON COMMIT DROP
+"""
+
+COPY_QUERY = f"""
+COPY {STAGING_TABLE} ({', '.join(PRODUCT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)
+"""
+
+MERGE_QUERY = f"""
+INSERT INTO {TABLE_NAME} ({', '.join(PRODUCT_COLUMNS)}, category_id)
+SELECT DISTINCT ON (product_id) {', '.join(PRODUCT_COLUMNS)}, %s::int
+FROM {STAGING_TABLE}
+ORDER BY product_id
+ON CONFLICT (product_id) DO NOTHING
+RETURNING product_id, category_id, discounted_price, actual_price, discount_percentage, rating, rating_count
 """
 
-CATEGORY_MAPPING = {
-    'electronics': 1,
-    'home_appliances': 2,
-    'books': 3,
-    'clothing': 4,
-    'sports': 5,
-    'toys': 6,
-    'beauty': 7,
-    'groceries': 8,
-    'furniture': 9,
-    'automotive': 10
-}
+CATEGORY_ID_QUERY = "SELECT id FROM categories WHERE lower(replace(name, ' ', '_')) = %s"
 
 total_products_added = 0
 total_products_existing = 0
 total_products_invalid = 0
+total_products_scored = 0
+total_files_unchanged = 0
+total_segments_loaded = 0
+total_price_changes = 0
+engine = None
+model_store = ModelStore()
+manifest = {}
+manifest_lock = threading.Lock()
 
-def add_product_link_column():
+def parse_row(row):
+    if len(row) < 9 or any(not row[i].strip() for i in range(9)):
+        return None
+    
+    product_id = row[0]
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cursor = conn.cursor()
-        alter_query = """
-        ALTER TABLE products ADD COLUMN IF NOT EXISTS product_link TEXT;
-        """
-        cursor.execute(alter_query)
-        conn.commit()
-    except Exception as e:
-        print(f"Error adding column: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+        discount_percentage = float(row[5])
+    except ValueError:
+        return None
+    
+    if discount_percentage < -100 or discount_percentage > 100:
+        print(f"[⚠] Invalid discount percentage for product {product_id}: {discount_percentage}%")
+        return None
+    discount_percentage = abs(discount_percentage)
+    
+    try:
+        features = (
+            float(row[3]),
+            float(row[4]),
+            discount_percentage,
+            float(row[6]),
+            int(row[7])
+        )
+    except ValueError:
+        return None
+    
+    return (product_id, row[1], row[2], *features, row[8], row[9] if len(row) > 9 else "")
+
+def price_observation(row, values, observed_at):
+    return (values[0], row[10] if len(row) > 10 and row[10] else observed_at, values[3])
 
-def insert_csv(filepath):
-    global total_products_added, total_products_existing, total_products_invalid
+def resolve_category_id(cursor, category_name):
+    cursor.execute(CATEGORY_ID_QUERY, (category_slug(category_name),))
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Unknown category '{category_name}', add it to the categories table first")
+    return row[0]
+
+def finish_file(cursor, category_name, category_id, inserted_rows, observations, added, existing, invalid):
+    global total_products_added, total_products_existing, total_products_invalid, total_products_scored, total_price_changes
     
-    category_name = os.path.splitext(os.path.basename(filepath))[0]
-    category_id = CATEGORY_MAPPING.get(category_name)
+    scored = write_scores(cursor, model_store.get() if inserted_rows else None, inserted_rows)
+    price_changes = record_prices(cursor, observations)
+    changed_categories = [category_id] if price_changes else []
+    bump_catalog_versions(cursor, [category_id for _, category_id, _ in inserted_rows] + changed_categories)
+    cursor.connection.commit()
+    
+    total_products_added += added
+    total_products_existing += existing
+    total_products_invalid += invalid
+    total_products_scored += scored
+    total_price_changes += price_changes
     
+    print(f"[📊] {category_name.capitalize()} import summary: {added} added, {existing} existing, {invalid} invalid, "
+          f"{scored} scored, {price_changes} price changes")
+
+def insert_rows(category_name, rows, row_hashes):
     file_products_added = 0
     file_products_existing = 0
     file_products_invalid = 0
+    inserted_rows = []
+    observations = []
+    observed_at = datetime.now(timezone.utc).isoformat()
     
-    if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
-        print(f"[!] File not found or empty: {filepath}")
-        return
-    
+    conn = cursor = None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = engine.raw_connection()
         cursor = conn.cursor()
+        category_id = resolve_category_id(cursor, category_name)
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            next(reader)
+        for row in rows:
+            values = parse_row(row)
+            if values is None:
+                file_products_invalid += 1
+                continue
             
-            for row in reader:
-                if len(row) < 9 or any(not row[i].strip() for i in range(9)):
-                    file_products_invalid += 1
-                    continue
-                
-                product_id = row[0]
-                
-                cursor.execute(f"SELECT 1 FROM {TABLE_NAME} WHERE product_id = %s LIMIT 1", (product_id,))
-                exists = cursor.fetchone() is not None
-                
-                if exists:
+            product_id = values[0]
+            observations.append(price_observation(row, values, observed_at))
+            try:
+                cursor.execute(INSERT_QUERY, (*values, category_id))
+                inserted = cursor.fetchone() is not None
+                conn.commit()
+                if not inserted:
                     print(f"[→] Product already exists: {product_id}")
                     file_products_existing += 1
                     continue
-           
-                try:
-                    discount_percentage = float(row[5])
-                    if discount_percentage < -100 or discount_percentage > 100:
-                        print(f"[⚠] Invalid discount percentage for product {product_id}: {discount_percentage}%")
-                        file_products_invalid += 1
-                        continue
-                    
-                    if discount_percentage < 0 and discount_percentage >= -100:
-                        discount_percentage = abs(discount_percentage)
-                except ValueError:
-                    file_products_invalid += 1
-                    continue
-                
-                try:
-                    cursor.execute(INSERT_QUERY, (
-                        product_id,               
-                        row[1],                    
-                        row[2],                   
-                        float(row[3]),             
-                        float(row[4]),            
-                        discount_percentage,       
-                        float(row[6]),           
-                        int(row[7]),          
-                        row[8],             
-                        row[9] if len(row) > 9 else "",  
-                        category_id  
-                    ))
-                    conn.commit()
-                    print(f"[✓] Added product: {product_id}")
-                    file_products_added += 1
-                except Exception as e:
-                    print(f"[✗] Error adding product {product_id}: {str(e)}")
-                    file_products_invalid += 1
+                print(f"[✓] Added product: {product_id}")
+                file_products_added += 1
+                inserted_rows.append((product_id, category_id, values[3:8]))
+            except Exception as e:
+                conn.rollback()
+                print(f"[✗] Error adding product {product_id}: {str(e)}")
+                file_products_invalid += 1
+                row_hashes.discard(row_hash(row))
+        
+        finish_file(cursor, category_name, category_id, inserted_rows, observations,
+                    file_products_added, file_products_existing, file_products_invalid)
+        return True
+    
+    except Exception as e:
+        print(f"[✗] Error importing {category_name}: {str(e)}")
+    finally:
+        if cursor is not None:
+            cursor.close()
+        if conn is not None:
+            conn.close()
+
+class CopyStream:
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ''
+    
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+def copy_lines(rows, counts, observations):
+    out = io.StringIO()
+    writer = csv.writer(out, quoting=csv.QUOTE_ALL, lineterminator='\n')
+    observed_at = datetime.now(timezone.utc).isoformat()
+    for row in rows:
+        values = parse_row(row)
+        if values is None:
+            counts['invalid'] += 1
+            continue
+        counts['valid'] += 1
+        observations.append(price_observation(row, values, observed_at))
+        writer.writerow(values)
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+
+def copy_rows(category_name, rows, row_hashes):
+    counts = {'valid': 0, 'invalid': 0}
+    observations = []
+    
+    conn = cursor = None
+    try:
+        conn = engine.raw_connection()
+        cursor = conn.cursor()
+        category_id = resolve_category_id(cursor, category_name)
+        cursor.execute(CREATE_STAGING_QUERY)
+        cursor.copy_expert(COPY_QUERY, CopyStream(copy_lines(rows, counts, observations)))
         
-        total_products_added += file_products_added
-        total_products_existing += file_products_existing
-        total_products_invalid += file_products_invalid
+        cursor.execute(MERGE_QUERY, (category_id,))
+        inserted_rows = [(row[0], row[1], row[2:]) for row in cursor.fetchall()]
         
-        print(f"[📊] {category_name.capitalize()} import summary: {file_products_added} added, {file_products_existing} existing, {file_products_invalid} invalid")
+        file_products_added = len(inserted_rows)
+        finish_file(cursor, category_name, category_id, inserted_rows, observations,
+                    file_products_added, counts['valid'] - file_products_added, counts['invalid'])
+        return True
     
+    except Exception as e:
+        print(f"[✗] Error importing {category_name}: {str(e)}")
+    finally:
+        if cursor is not None:
+            cursor.close()
+        if conn is not None:
+            conn.close()
+
+def load_csv(filepath, seen):
+    category_name = os.path.splitext(os.path.basename(filepath))[0]
+    load_rows = copy_rows if INGEST_MODE == 'copy' else insert_rows
+    row_hashes = set()
+    
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader)
+            if not load_rows(category_name, unseen_rows(reader, seen, row_hashes), row_hashes):
+                return None
+        return row_hashes
     except Exception as e:
         print(f"[✗] Error processing file {filepath}: {str(e)}")
+
+def current_database_id():
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            return catalog_identity(cursor)
     finally:
-        cursor.close()
+        conn.rollback()
         conn.close()
 
+def load_manifest(database_id):
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+    except (OSError, ValueError):
+        loaded = {}
+    if loaded.get('database_id') != database_id:
+        if loaded:
+            print("[!] Ingest manifest belongs to another database, importing all sources again")
+        return {'database_id': database_id}
+    return loaded
+
+def save_manifest():
+    manifest_tmp = MANIFEST_PATH + '.tmp'
+    with open(manifest_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(manifest_tmp, MANIFEST_PATH)
+
+def content_hash(filepath):
+    digest = hashlib.blake2b()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def row_hash(row):
+    return hashlib.blake2b('\x1f'.join(row).encode('utf-8'), digest_size=8).hexdigest()
+
+def unseen_rows(reader, seen, row_hashes):
+    for row in reader:
+        digest = row_hash(row)
+        if digest in seen or digest in row_hashes:
+            continue
+        row_hashes.add(digest)
+        yield row
+
+def ingest_file(filepath):
+    global total_files_unchanged
+    
+    if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+        print(f"[!] File not found or empty: {filepath}")
+        return
+    
+    stat = os.stat(filepath)
+    entry = manifest.get(filepath)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        total_files_unchanged += 1
+        return
+    
+    digest = content_hash(filepath)
+    if entry and entry['hash'] == digest:
+        with manifest_lock:
+            manifest[filepath] = {**entry, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        total_files_unchanged += 1
+        return
+    
+    seen = set(entry['rows']) if entry else set()
+    row_hashes = load_csv(filepath, seen)
+    if row_hashes is None:
+        return FAILED
+    
+    with manifest_lock:
+        manifest[filepath] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': digest,
+            'rows': sorted(seen | row_hashes)
+        }
+
+def ingest_segments(category_name):
+    global total_segments_loaded
+    
+    key = f'{SEGMENTS_DIR}/{category_name}'
+    watermark = manifest.get(key, {}).get('watermark', '')
+    paths = [path for path in list_segments(os.path.join(SEGMENTS_PATH, category_name)) if segment_key(path) > watermark]
+    if not paths:
+        return
+    
+    batch = paths[:MAX_SEGMENTS_PER_BATCH]
+    load_rows = copy_rows if INGEST_MODE == 'copy' else insert_rows
+    rows = chain.from_iterable(read_segment(path) for path in batch)
+    try:
+        if not load_rows(category_name, rows, set()):
+            return FAILED
+    except Exception as e:
+        print(f"[✗] Error loading segments for {category_name}: {str(e)}")
+        return FAILED
+    
+    with manifest_lock:
+        manifest[key] = {'watermark': segment_key(batch[-1])}
+        total_segments_loaded += len(batch)
+    if len(paths) > len(batch):
+        return BACKLOG
+
+def refresh_expired_price_stats():
+    conn = None
+    try:
+        conn = engine.raw_connection()
+        with conn.cursor() as cursor:
+            refreshed = refresh_expired_stats(cursor)
+        conn.commit()
+        if refreshed:
+            print(f"[✓] Refreshed 30-day price window for {refreshed} products")
+        return refreshed
+    except Exception as e:
+        if conn is not None:
+            conn.rollback()
+        print(f"[✗] Error refreshing price windows: {str(e)}")
+        return FAILED
+    finally:
+        if conn is not None:
+            conn.close()
+
+def export_feature_snapshot(force=False):
+    try:
+        version = export_snapshot(engine, force=force)
+        if version is not None:
+            print(f"[✓] Published feature snapshot {version}")
+    except Exception as e:
+        print(f"[✗] Error exporting feature snapshot: {str(e)}")
+
+def path_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def scan_sources():
+    sources = {('file', os.path.join(CSV_DIR, filename)): None for filename in CSV_FILES}
+    sources.update({('segments', name): None for name in list_categories(CSV_DIR)})
+    for kind, target in sources:
+        path = target if kind == 'file' else os.path.join(SEGMENTS_PATH, target)
+        sources[(kind, target)] = path_signature(path)
+    return sources
+
+def ingest_source(source):
+    kind, target = source
+    return ingest_file(target) if kind == 'file' else ingest_segments(target)
+
+def run_batch(sources):
+    with ThreadPoolExecutor(max_workers=INGEST_WORKERS) as executor:
+        results = dict(zip(sources, executor.map(ingest_source, sources)))
+    save_manifest()
+    return results
+
+def import_totals():
+    return (total_products_added, total_products_existing, total_products_invalid,
+            total_segments_loaded, total_price_changes)
+
+def watch(interval=WATCH_INTERVAL):
+    global manifest
+    print(f"[🚀] Watching {CSV_DIR} for new product data every {interval:g}s...")
+    signatures = {}
+    backlog = []
+    dirty = False
+    expired_checked_at = 0.0
+    failures = 0
+    while True:
+        try:
+            database_id = current_database_id()
+            if manifest.get('database_id') != database_id:
+                print("[!] Database was reset, importing all sources again")
+                with manifest_lock:
+                    manifest = {'database_id': database_id}
+                signatures, backlog = {}, []
+            current = scan_sources()
+            changed = [source for source, signature in current.items() if signatures.get(source) != signature]
+            sources = list(dict.fromkeys(changed + backlog))
+            
+            before = import_totals()
+            results = run_batch(sources) if sources else {}
+            signatures = current
+            backlog = [source for source, result in results.items() if result == BACKLOG]
+            failed = [source for source, result in results.items() if result == FAILED]
+            for source in failed:
+                signatures.pop(source, None)
+            
+            refreshed = 0
+            if time.monotonic() - expired_checked_at >= EXPIRED_STATS_INTERVAL:
+                refreshed = refresh_expired_price_stats()
+                if refreshed == FAILED:
+                    failed.append(('price_stats', None))
+                    refreshed = 0
+                else:
+                    expired_checked_at = time.monotonic()
+            if import_totals() != before:
+                dirty = True
+                added, existing, invalid, segments, price_changes = (
+                    after - start for after, start in zip(import_totals(), before)
+                )
+                print(f"[📊] Batch of {len(sources)} sources: {added} added, {existing} existing, {invalid} invalid, "
+                      f"{segments} segments, {price_changes} price changes")
+            
+            failures = failures + 1 if failed else 0
+            if backlog and not failures:
+                continue
+            if (dirty or refreshed) and not backlog:
+                export_feature_snapshot(force=bool(refreshed))
+                dirty = False
+        except Exception as e:
+            failures += 1
+            print(f"[✗] Error in watch iteration: {str(e)}")
+        delay = min(interval * 2 ** failures, WATCH_MAX_BACKOFF) if failures else interval
+        if failures:
+            print(f"[!] Retrying in {delay:g}s after {failures} failed attempts")
+        time.sleep(delay)
+
 def main():
+    global engine, manifest
+    
+    parser = argparse.ArgumentParser(description='Import scraped products into PostgreSQL.')
+    parser.add_argument('--watch', action='store_true', help='Keep running and import new or changed data as it lands')
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL, help='Seconds between scans in watch mode')
+    args = parser.parse_args()
+    
     print("[🚀] Starting product import process...")
-    add_product_link_column()
-    print("[✓] Product link column ensured")
+    engine = create_pool_engine()
+    apply_migrations(engine)
+    print("[✓] Database schema up to date")
+    manifest = load_manifest(current_database_id())
+    
+    if args.watch:
+        watch(args.interval)
+        return
     
-    filepaths = [os.path.join(CSV_DIR, filename) for filename in CSV_FILES]
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        executor.map(insert_csv, filepaths)
+    run_batch(list(scan_sources()))
+    refreshed = refresh_expired_price_stats()
+    export_feature_snapshot(force=refreshed != FAILED and refreshed > 0)
     
     print("\n" + "="*50)
     print(f"[📊] IMPORT COMPLETE")
     print(f"[📊] Total products added: {total_products_added}")
     print(f"[📊] Total products already existing: {total_products_existing}")
     print(f"[📊] Total products invalid or skipped: {total_products_invalid}")
+    print(f"[📊] Total products scored: {total_products_scored}")
+    print(f"[📊] Total files unchanged: {total_files_unchanged}")
+    print(f"[📊] Total new segments loaded: {total_segments_loaded}")
+    print(f"[📊] Total price changes recorded: {total_price_changes}")
+    stats = pool_stats(engine)
+    print(f"[📊] Connection pool: {stats['checkouts']} checkouts, "
+          f"{stats['wait_seconds_max'] * 1000:.1f} ms max wait, {stats['timeouts']} timeouts")
     print("="*50)
 
 if __name__ == '__main__':
@@ -0,0 +1,48 @@
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    product_name TEXT,
+    category TEXT,
+    discounted_price FLOAT,
+    actual_price FLOAT,
+    discount_percentage FLOAT,
+    rating FLOAT,
+    rating_count INT,
+    about_product TEXT,
+    product_link TEXT,
+    category_id INT
+);
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS product_link TEXT;
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS user_preferences (
+    id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES users (id),
+    category_id INT NOT NULL REFERENCES categories (id)
+);
+
+CREATE TABLE IF NOT EXISTS product_scores (
+    product_id TEXT PRIMARY KEY REFERENCES products (product_id) ON DELETE CASCADE,
+    category_id INT,
+    score FLOAT NOT NULL,
+    model_version TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS product_scores_category_score_idx ON product_scores (category_id, score DESC);
+
+CREATE TABLE IF NOT EXISTS catalog_versions (
+    category_id INT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
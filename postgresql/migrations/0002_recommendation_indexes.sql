@@ -0,0 +1,9 @@
+-- migrate: no-transaction
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS products_discounted_category_idx
+    ON products (category_id)
+    INCLUDE (product_id, discounted_price, actual_price, discount_percentage, rating, rating_count)
+    WHERE discount_percentage > 0;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_preferences_user_id_idx
+    ON user_preferences (user_id);
@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS user_recommendations (
+    user_id INT PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+    category_key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    recommendations JSONB NOT NULL,
+    computed_at TIMESTAMP NOT NULL DEFAULT now()
+);
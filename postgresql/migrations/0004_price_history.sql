@@ -0,0 +1,28 @@
+CREATE TABLE IF NOT EXISTS price_history (
+    product_id TEXT NOT NULL REFERENCES products (product_id) ON DELETE CASCADE,
+    observed_at TIMESTAMP NOT NULL,
+    price FLOAT NOT NULL,
+    PRIMARY KEY (product_id, observed_at)
+);
+
+CREATE TABLE IF NOT EXISTS price_stats (
+    product_id TEXT PRIMARY KEY REFERENCES products (product_id) ON DELETE CASCADE,
+    current_price FLOAT NOT NULL,
+    previous_price FLOAT,
+    changed_at TIMESTAMP NOT NULL,
+    min_price_30d FLOAT NOT NULL,
+    min_expires_at TIMESTAMP,
+    changes INT NOT NULL DEFAULT 1
+);
+
+CREATE INDEX IF NOT EXISTS price_stats_min_expires_at_idx ON price_stats (min_expires_at)
+    WHERE min_expires_at IS NOT NULL;
+
+INSERT INTO price_history (product_id, observed_at, price)
+SELECT product_id, now(), discounted_price FROM products
+WHERE discounted_price IS NOT NULL
+ON CONFLICT DO NOTHING;
+
+INSERT INTO price_stats (product_id, current_price, changed_at, min_price_30d)
+SELECT product_id, price, observed_at, price FROM price_history
+ON CONFLICT (product_id) DO NOTHING;
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS catalog_identity (
+    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+    database_id TEXT NOT NULL DEFAULT gen_random_uuid()::text,
+    created_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+INSERT INTO catalog_identity (singleton, database_id) VALUES (TRUE, gen_random_uuid()::text)
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,17 @@
+INSERT INTO categories (name) VALUES
+    ('Electronics'), ('Home_and_Kitchen'), ('Books'), ('Clothing'), ('Sports_and_Outdoors'),
+    ('Toys_and_Games'), ('Beauty_and_Personal_Care'), ('Grocery_and_Gourmet_Food'),
+    ('Health_and_Household'), ('Pet_Supplies')
+ON CONFLICT (name) DO NOTHING;
+
+WITH backfilled AS (
+    UPDATE products p SET category_id = c.id
+    FROM categories c
+    WHERE p.category_id IS NULL AND lower(replace(p.category, ' ', '_')) = lower(replace(c.name, ' ', '_'))
+    RETURNING p.category_id
+)
+INSERT INTO catalog_versions (category_id, version, updated_at)
+SELECT DISTINCT category_id, 1, now() FROM backfilled
+ON CONFLICT (category_id) DO UPDATE SET
+    version = catalog_versions.version + 1,
+    updated_at = now();
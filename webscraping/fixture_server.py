@@ -0,0 +1,61 @@
+import os
+import re
+import argparse
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURES_PORT = 8800
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def translate_path(self, path):
+        parsed = urlparse(path)
+        query = parse_qs(parsed.query)
+        match = re.match(r'/dp/([A-Z0-9]{10})', parsed.path)
+        if match:
+            relative = os.path.join('dp', f'{match.group(1)}.html')
+        elif parsed.path == '/s' and 'k' in query:
+            keyword = query['k'][0].replace(' ', '_').replace('+', '_')
+            relative = os.path.join('search', f"{keyword}-{query.get('page', ['1'])[0]}.html")
+        else:
+            relative = 'missing.html'
+        return os.path.join(self.directory, relative)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(directory=FIXTURES_DIR, host='127.0.0.1', port=FIXTURES_PORT):
+    handler = partial(FixtureHandler, directory=directory)
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name='fixture-server', daemon=True).start()
+    return server, f'http://{host}:{server.server_port}'
+
+
+def fixture_keywords(directory=FIXTURES_DIR):
+    return {
+        name.rsplit('-', 1)[0]
+        for name in os.listdir(os.path.join(directory, 'search'))
+        if name.endswith('-1.html')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the scraper HTML fixtures with Amazon-style URLs.')
+    parser.add_argument('--directory', default=FIXTURES_DIR)
+    parser.add_argument('--port', type=int, default=FIXTURES_PORT)
+    args = parser.parse_args()
+
+    server, base_url = serve_fixtures(args.directory, port=args.port)
+    print(f"[*] Serving {args.directory} at {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import re
+from urllib.parse import urljoin
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+TITLE = CSSSelector('#productTitle')
+PRICE = CSSSelector('.a-price .a-offscreen')
+PRICE_BLOCK = CSSSelector('#priceblock_ourprice, #priceblock_dealprice')
+STRIKE_PRICE = CSSSelector('.a-text-strike')
+RATING = CSSSelector('span[data-hook="rating-out-of-text"], .a-icon-star')
+REVIEW_COUNT = CSSSelector('#acrCustomerReviewText')
+BULLETS = CSSSelector('#feature-bullets li .a-list-item')
+DESCRIPTION = CSSSelector('#productDescription')
+
+PRODUCT_CARDS = CSSSelector('.s-result-item[data-component-type="s-search-result"]')
+PRODUCT_LINK = CSSSelector('h2 a, .a-link-normal.a-text-normal')
+NEXT_PAGE = CSSSelector('.s-pagination-next:not(.s-pagination-disabled)')
+
+PRODUCT_READY = TITLE
+LISTING_READY = CSSSelector('.s-result-item')
+
+
+def get_product_id(url):
+    match = re.search(r'/dp/([A-Z0-9]{10})', url)
+    if match:
+        return match.group(1)
+    return "N/A"
+
+
+def extract_price_value(price_text):
+    if price_text == "N/A":
+        return None
+
+    numeric_string = re.sub(r'[^\d.]', '', price_text)
+    try:
+        return float(numeric_string)
+    except ValueError:
+        return None
+
+
+def extract_percentage(percentage_text):
+    if percentage_text == "N/A" or not percentage_text:
+        return None
+
+    match = re.search(r'(\d+\.?\d*)', percentage_text)
+    if match:
+        try:
+            return float(match.group(1))
+        except ValueError:
+            return None
+    return None
+
+
+def parse_document(html):
+    return lxml.html.fromstring(html)
+
+
+def is_ready(document, selector):
+    return document is not None and bool(selector(document))
+
+
+def visible_text(element):
+    return ' '.join(element.text_content().split())
+
+
+def first(selector, document):
+    matches = selector(document)
+    return matches[0] if matches else None
+
+
+def parse_product(document, url, category_name):
+    product_data = {
+        "product_id": get_product_id(url),
+        "product_name": "N/A",
+        "category": category_name,
+        "discounted_price": None,
+        "actual_price": None,
+        "discount_percentage": None,
+        "rating": None,
+        "rating_count": 0,
+        "about_product": "N/A",
+        "product_link": url
+    }
+
+    title = first(TITLE, document)
+    if title is not None:
+        product_data["product_name"] = visible_text(title)
+
+    price_text = "N/A"
+    price_elem = first(PRICE, document)
+    if price_elem is not None:
+        price_text = price_elem.text_content().strip()
+    else:
+        price_elem = first(PRICE_BLOCK, document)
+        if price_elem is not None:
+            price_text = visible_text(price_elem)
+
+    product_data["discounted_price"] = extract_price_value(price_text)
+
+    if product_data["discounted_price"] is None:
+        return None
+
+    original_price = first(STRIKE_PRICE, document)
+    if original_price is not None:
+        product_data["actual_price"] = extract_price_value(visible_text(original_price))
+
+        if product_data["discounted_price"] and product_data["actual_price"]:
+            if product_data["actual_price"] > 0:
+                discount = ((product_data["actual_price"] - product_data["discounted_price"]) / product_data["actual_price"]) * 100
+                product_data["discount_percentage"] = round(discount, 1)
+
+    rating_elem = first(RATING, document)
+    if rating_elem is not None:
+        rating_text = rating_elem.text_content().strip() or rating_elem.get('aria-label')
+        if rating_text:
+            try:
+                product_data["rating"] = float(rating_text.split(' ')[0])
+            except ValueError:
+                pass
+
+    count_elem = first(REVIEW_COUNT, document)
+    if count_elem is not None:
+        count_str = visible_text(count_elem).split(' ')[0].replace(',', '')
+        try:
+            product_data["rating_count"] = int(count_str)
+        except ValueError:
+            pass
+
+    bullet_points = BULLETS(document)
+    if bullet_points:
+        product_data["about_product"] = ' '.join(visible_text(elem) for elem in bullet_points)
+    else:
+        description = first(DESCRIPTION, document)
+        if description is not None:
+            product_data["about_product"] = visible_text(description)
+
+    return product_data
+
+
+def parse_listing(document, page_url):
+    product_urls = []
+    for card in PRODUCT_CARDS(document):
+        product_link = first(PRODUCT_LINK, card)
+        if product_link is None:
+            continue
+        href = product_link.get('href')
+        if href:
+            href = urljoin(page_url, href)
+            if '/dp/' in href or '/gp/product/' in href:
+                product_urls.append(href)
+
+    next_page = first(NEXT_PAGE, document)
+    next_url = urljoin(page_url, next_page.get('href')) if next_page is not None and next_page.get('href') else None
+    return product_urls, next_url
@@ -1,22 +1,31 @@
 import time
 import random
 import csv
-import pandas as pd
-import re
 import logging
 import os
+import json
+import argparse
+import tempfile
 import threading
-from queue import Queue
-from urllib.parse import urljoin, urlparse, parse_qs
+from datetime import datetime, timezone
+from contextlib import contextmanager
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import Queue, Empty
+from urllib.parse import urlparse, parse_qs
+import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 
+from product_parser import (
+    LISTING_READY, PRODUCT_READY, get_product_id, is_ready, parse_document, parse_listing, parse_product
+)
+from segments import SegmentWriter, new_run_id
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -46,7 +55,26 @@ categories = [
     {"name": "Pet_Supplies", "url": "https://www.amazon.com/s?k=pet+supplies"}
 ]
 
+DRIVER_POOL_SIZE = int(os.environ.get('SCRAPER_DRIVERS', 3))
+WORKERS = int(os.environ.get('SCRAPER_WORKERS', 4))
+HOST_RATE = float(os.environ.get('SCRAPER_HOST_RATE', 0.5))
+TRANSPORT = os.environ.get('SCRAPER_TRANSPORT', 'auto')
+HTTP_TIMEOUT = float(os.environ.get('SCRAPER_HTTP_TIMEOUT', 15))
+CHECKPOINT_PATH = os.environ.get('SCRAPER_CHECKPOINT', 'amazon_data/.scrape_checkpoint.json')
+OUTPUT_DIR = 'amazon_data'
+MAX_PAGES = 10
+SAVE_EVERY = 10
+
 file_lock = threading.Lock()
+driver_path_lock = threading.Lock()
+driver_path = None
+
+def chromedriver_path():
+    global driver_path
+    with driver_path_lock:
+        if driver_path is None:
+            driver_path = ChromeDriverManager().install()
+        return driver_path
 
 def setup_driver():
     options = Options()
@@ -58,7 +86,7 @@ def setup_driver():
     
     options.add_argument("--headless")
     
-    service = Service(ChromeDriverManager().install())
+    service = Service(chromedriver_path())
     driver = webdriver.Chrome(service=service, options=options)
     
     driver.set_window_size(1366, 768)
@@ -67,183 +95,84 @@ def setup_driver():
     
     return driver
 
-def get_product_id(url):
-    match = re.search(r'/dp/([A-Z0-9]{10})', url)
-    if match:
-        return match.group(1)
-    return "N/A"
-
-def extract_price_value(price_text):
-    if price_text == "N/A":
-        return None
+class PageFetcher:
+    def __init__(self, pool, limiter, transport=TRANSPORT):
+        self.pool = pool
+        self.limiter = limiter
+        self.transport = transport
+        self.http_pages = 0
+        self.browser_pages = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
     
-    numeric_string = re.sub(r'[^\d.]', '', price_text)
-    try:
-        return float(numeric_string)
-    except ValueError:
-        return None
-
-def extract_percentage(percentage_text):
-    if percentage_text == "N/A" or not percentage_text:
-        return None
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': random.choice(USER_AGENTS),
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.9'
+            })
+            self._local.session = session
+        return session
     
-    match = re.search(r'(\d+\.?\d*)', percentage_text)
-    if match:
+    def fetch_http(self, url):
         try:
-            return float(match.group(1))
-        except ValueError:
+            response = self.session().get(url, timeout=HTTP_TIMEOUT)
+        except requests.RequestException as e:
+            logger.warning(f"HTTP fetch failed for {url}: {str(e)}")
             return None
-    return None
-
-def get_product_details(driver, url, category_name):
-    try:
-        logger.info(f"Navigating to product: {url}")
-        driver.get(url)
-        
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "productTitle"))
-        )
-        
-        time.sleep(random.uniform(2, 5))
-        
-        product_data = {
-            "product_id": get_product_id(url),
-            "product_name": "N/A",
-            "category": category_name,
-            "discounted_price": None,
-            "actual_price": None,
-            "discount_percentage": None,
-            "rating": None,
-            "rating_count": 0,
-            "about_product": "N/A",
-            "product_link": url
-        }
-        
-        try:
-            product_data["product_name"] = driver.find_element(By.ID, "productTitle").text.strip()
-        except NoSuchElementException:
-            pass
-        
-        price_text = "N/A"
-        try:
-            price_elem = driver.find_element(By.CSS_SELECTOR, '.a-price .a-offscreen')
-            price_text = price_elem.get_attribute('textContent').strip()
-        except NoSuchElementException:
-            try:
-                price_elem = driver.find_element(By.CSS_SELECTOR, '#priceblock_ourprice, #priceblock_dealprice')
-                price_text = price_elem.text.strip()
-            except NoSuchElementException:
-                pass
-        
-        product_data["discounted_price"] = extract_price_value(price_text)
-        
-        if product_data["discounted_price"] is None:
+        if response.status_code != 200:
+            logger.warning(f"HTTP fetch of {url} returned {response.status_code}")
             return None
-        
-        original_price_text = "N/A"
-        try:
-            original_price = driver.find_element(By.CSS_SELECTOR, '.a-text-strike')
-            original_price_text = original_price.text.strip()
-            product_data["actual_price"] = extract_price_value(original_price_text)
-            
-            if product_data["discounted_price"] and product_data["actual_price"]:
-                if product_data["actual_price"] > 0:
-                    discount = ((product_data["actual_price"] - product_data["discounted_price"]) / product_data["actual_price"]) * 100
-                    product_data["discount_percentage"] = round(discount, 1)
-        except NoSuchElementException:
-            pass
-        
-        try:
-            rating_elem = driver.find_element(By.CSS_SELECTOR, 'span[data-hook="rating-out-of-text"], .a-icon-star')
-            rating_text = rating_elem.get_attribute('textContent') or rating_elem.get_attribute('aria-label')
-            if rating_text:
-                rating_str = rating_text.split(' ')[0]
-                try:
-                    product_data["rating"] = float(rating_str)
-                except ValueError:
-                    pass
-        except NoSuchElementException:
-            pass
-        
-        try:
-            count_elem = driver.find_element(By.ID, 'acrCustomerReviewText')
-            count_text = count_elem.text.strip()
-            count_str = count_text.split(' ')[0].replace(',', '')
-            try:
-                product_data["rating_count"] = int(count_str)
-            except ValueError:
-                pass
-        except NoSuchElementException:
-            pass
-        
-        try:
-            bullet_points = driver.find_elements(By.CSS_SELECTOR, '#feature-bullets li .a-list-item')
-            if bullet_points:
-                descriptions = [elem.text.strip() for elem in bullet_points]
-                product_data["about_product"] = ' '.join(descriptions)
-        except NoSuchElementException:
+        return parse_document(response.content)
+    
+    def fetch_browser(self, url, ready):
+        with self.pool.driver() as driver:
+            driver.get(url)
             try:
-                description = driver.find_element(By.ID, 'productDescription')
-                product_data["about_product"] = description.text.strip()
-            except NoSuchElementException:
-                pass
-        
-        return product_data
-    except Exception as e:
-        logger.error(f"Error scraping product {url}: {str(e)}")
-        return None
-
-def get_next_page_url(driver, current_url):
-    try:
-        next_page_btn = driver.find_element(By.CSS_SELECTOR, '.s-pagination-next:not(.s-pagination-disabled)')
-        if next_page_btn:
-            return next_page_btn.get_attribute("href")
-    except NoSuchElementException:
-        pass
+                WebDriverWait(driver, 10).until(lambda d: is_ready(parse_document(d.page_source), ready))
+            except TimeoutException:
+                logger.warning(f"Timed out waiting for {url} to render")
+            return parse_document(driver.page_source)
     
-    return None
+    def fetch(self, url, ready):
+        if self.transport != 'browser':
+            self.limiter.wait(url)
+            document = self.fetch_http(url)
+            if self.transport == 'http' or is_ready(document, ready):
+                with self._lock:
+                    self.http_pages += 1
+                return document
+            logger.info(f"Falling back to the browser for {url}")
+        self.limiter.wait(url)
+        document = self.fetch_browser(url, ready)
+        with self._lock:
+            self.browser_pages += 1
+        return document
 
-def get_products_from_category(driver, category):
+def get_products_from_category(fetcher, category, max_pages=MAX_PAGES):
     logger.info(f"Scraping category: {category['name']}")
     all_product_urls = []
     current_page = 1
     current_url = category['url']
-    max_pages = 10 
     
     while current_url and current_page <= max_pages:
         try:
             logger.info(f"Navigating to page {current_page}: {current_url}")
-            driver.get(current_url)
-            
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '.s-result-item'))
-            )
-            
-            time.sleep(random.uniform(3, 6))
-            
-            product_cards = driver.find_elements(By.CSS_SELECTOR, '.s-result-item[data-component-type="s-search-result"]')
-            
-            product_urls = []
-            logger.info(f"Found {len(product_cards)} product cards on page {current_page}")
+            document = fetcher.fetch(current_url, LISTING_READY)
+            if document is None:
+                break
             
-            for card in product_cards:
-                try:
-                    product_link = card.find_element(By.CSS_SELECTOR, 'h2 a, .a-link-normal.a-text-normal')
-                    if product_link:
-                        href = product_link.get_attribute('href')
-                        if href and ('/dp/' in href or '/gp/product/' in href):
-                            product_urls.append(href)
-                            logger.info(f"Added product URL: {href}")
-                except NoSuchElementException:
-                    continue
+            product_urls, next_url = parse_listing(document, current_url)
+            logger.info(f"Found {len(product_urls)} product links on page {current_page}")
             
             all_product_urls.extend(product_urls)
             
-            next_url = get_next_page_url(driver, current_url)
             if next_url:
                 current_url = next_url
                 current_page += 1
-                time.sleep(random.uniform(5, 8))
             else:
                 break
         except Exception as e:
@@ -253,115 +182,288 @@ def get_products_from_category(driver, category):
     logger.info(f"Found a total of {len(all_product_urls)} products across {current_page} pages in {category['name']}")
     return all_product_urls
 
-def save_to_csv(products, category_name):
-    if not products:
-        logger.warning(f"No products to save for {category_name}")
-        return
+class DriverPool:
+    def __init__(self, size=DRIVER_POOL_SIZE, factory=setup_driver):
+        self.size = size
+        self.factory = factory
+        self._idle = Queue()
+        self._drivers = []
+        self._slots = threading.Semaphore(size)
+        self._lock = threading.Lock()
     
-    filename = f"amazon_data/{category_name.lower().replace(' ', '_')}.csv"
+    @contextmanager
+    def driver(self):
+        self._slots.acquire()
+        try:
+            try:
+                driver = self._idle.get_nowait()
+            except Empty:
+                driver = self.factory()
+                with self._lock:
+                    self._drivers.append(driver)
+            try:
+                yield driver
+            except WebDriverException:
+                self._discard(driver)
+                raise
+            except BaseException:
+                self._idle.put(driver)
+                raise
+            self._idle.put(driver)
+        finally:
+            self._slots.release()
     
-    with file_lock:
+    def _discard(self, driver):
+        logger.warning("Discarding broken browser session")
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
         try:
-            df = pd.DataFrame(products)
-            columns = [
-                "product_id", 
-                "product_name", 
-                "category", 
-                "discounted_price", 
-                "actual_price", 
-                "discount_percentage", 
-                "rating", 
-                "rating_count", 
-                "about_product", 
-                "product_link"
-            ]
-            df = df[columns]
-            df.to_csv(filename, index=False)
-            logger.info(f"Successfully saved {len(products)} products to {filename}")
-        except Exception as e:
-            logger.error(f"Error saving CSV for {category_name}: {str(e)}")
+            driver.quit()
+        except Exception:
+            pass
+    
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+class HostRateLimiter:
+    def __init__(self, rate=HOST_RATE, jitter=0.5):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.jitter = jitter
+        self._next_slot = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval * random.uniform(1, 1 + self.jitter)
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+def visit_key(url):
+    product_id = get_product_id(url)
+    return product_id if product_id != "N/A" else url
 
-def process_category(category):
-    thread_name = threading.current_thread().name
-    logger.info(f"{thread_name} - Processing category: {category['name']}")
+class Checkpoint:
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self.listings = {}
+        self.visited = set()
+        self.run_id = new_run_id()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.listings = data.get('listings', {})
+            self.visited = set(data.get('visited', []))
+            self.run_id = data.get('run_id', self.run_id)
+            logger.info(f"Resuming run {self.run_id} from {path}: {len(self.listings)} category listings, {len(self.visited)} products visited")
     
-    driver = setup_driver()
-    products = []
+    @property
+    def resumed(self):
+        return bool(self.listings or self.visited)
     
-    try:
-        product_urls = get_products_from_category(driver, category)
-        
-        logger.info(f"{thread_name} - Will scrape {len(product_urls)} products for {category['name']}")
-        
-        for idx, url in enumerate(product_urls):
-            try:
-                logger.info(f"{thread_name} - Processing product {idx+1}/{len(product_urls)} in {category['name']}")
-                product_data = get_product_details(driver, url, category['name'])
-                
-                if product_data:
-                    products.append(product_data)
-                    
-                time.sleep(random.uniform(3, 8))
-                
-                if (idx + 1) % 10 == 0:
-                    save_to_csv(products, category['name'])
-                    logger.info(f"{thread_name} - Saved intermediate results ({idx+1} products) for {category['name']}")
-            except Exception as e:
-                logger.error(f"{thread_name} - Error processing product {url}: {str(e)}")
-                continue
-        
+    def listing(self, category_name):
+        return self.listings.get(category_name)
+    
+    def set_listing(self, category_name, urls):
+        with self._lock:
+            self.listings[category_name] = urls
+        self.save()
+    
+    def is_visited(self, url):
+        return visit_key(url) in self.visited
+    
+    def mark_visited(self, urls):
+        with self._lock:
+            self.visited.update(visit_key(url) for url in urls)
+        self.save()
+    
+    def save(self):
+        with self._lock:
+            data = {'run_id': self.run_id, 'listings': self.listings, 'visited': sorted(self.visited)}
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(f.name, self.path)
+    
+    def clear(self):
+        with self._lock:
+            self.listings, self.visited = {}, set()
+            self.run_id = new_run_id()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+class ScrapeScheduler:
+    def __init__(self, fetcher, checkpoint, output_dir=OUTPUT_DIR, max_pages=MAX_PAGES, workers=WORKERS):
+        self.fetcher = fetcher
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.output_dir = output_dir
+        self.max_pages = max_pages
+    
+    def fetch_listing(self, category):
+        urls = self.checkpoint.listing(category['name'])
+        if urls is None:
+            urls = get_products_from_category(self.fetcher, category, self.max_pages)
+            self.checkpoint.set_listing(category['name'], urls)
+        return urls
+    
+    def fetch_product(self, url, category_name):
+        logger.info(f"Navigating to product: {url}")
+        document = self.fetcher.fetch(url, PRODUCT_READY)
+        if document is None:
+            return None
+        product_data = parse_product(document, url, category_name)
+        if product_data:
+            product_data['scraped_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        return product_data
+    
+    def flush(self, writer, products, visited):
         if products:
-            save_to_csv(products, category['name'])
-            logger.info(f"{thread_name} - Completed scraping {len(products)} products for {category['name']}")
-    except Exception as e:
-        logger.error(f"{thread_name} - Error processing category {category['name']}: {str(e)}")
-    finally:
-        driver.quit()
+            path = writer.append(products)
+            if path:
+                logger.info(f"Wrote {path}")
+            products.clear()
+        self.checkpoint.mark_visited(visited)
+        visited.clear()
+    
+    def run(self, categories):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scraper') as executor:
+            listings = {}
+            for category, urls in zip(categories, executor.map(self.fetch_listing, categories)):
+                listings[category['name']] = urls
+            
+            writers = {}
+            pending = {}
+            for category in categories:
+                name = category['name']
+                writers[name] = SegmentWriter(self.output_dir, name, self.checkpoint.run_id)
+                seen = set()
+                pending[name] = []
+                for url in listings[name]:
+                    key = visit_key(url)
+                    if key not in seen and not self.checkpoint.is_visited(url):
+                        seen.add(key)
+                        pending[name].append(url)
+                logger.info(f"{name}: {len(pending[name])} products to scrape, {len(listings[name]) - len(pending[name])} already visited or duplicated")
+            
+            futures = {}
+            for batch in zip_longest(*[[(name, url) for url in urls] for name, urls in pending.items()]):
+                for name, url in filter(None, batch):
+                    futures[executor.submit(self.fetch_product, url, name)] = (name, url)
+            
+            products = {name: [] for name in pending}
+            visited = {name: [] for name in pending}
+            try:
+                for future in as_completed(futures):
+                    name, url = futures[future]
+                    try:
+                        product_data = future.result()
+                        if product_data:
+                            products[name].append(product_data)
+                    except Exception as e:
+                        logger.error(f"Error processing product {url}: {str(e)}")
+                    visited[name].append(url)
+                    if len(visited[name]) >= SAVE_EVERY:
+                        self.flush(writers[name], products[name], visited[name])
+            except KeyboardInterrupt:
+                executor.shutdown(wait=False, cancel_futures=True)
+                for name in pending:
+                    if visited[name]:
+                        self.flush(writers[name], products[name], visited[name])
+                raise
+            
+            for name in pending:
+                self.flush(writers[name], products[name], visited[name])
+                logger.info(f"Completed scraping {len(writers[name].written)} products for {name} in run {self.checkpoint.run_id}")
+        return {name: len(writer.written) for name, writer in writers.items()}
 
-def category_thread_worker(category_queue):
-    while not category_queue.empty():
-        try:
-            category = category_queue.get()
-            process_category(category)
-            category_queue.task_done()
-        except Exception as e:
-            logger.error(f"Thread error: {str(e)}")
-            category_queue.task_done()
+def select_categories(names=None, base_url=None):
+    selected = [dict(category) for category in categories if not names or category['name'] in names]
+    if base_url:
+        for category in selected:
+            category['url'] = category['url'].replace('https://www.amazon.com', base_url)
+    return selected
 
 def main():
-    os.makedirs("amazon_data", exist_ok=True)
+    parser = argparse.ArgumentParser(description='Scrape Amazon category listings and product pages into append-only segments under amazon_data/segments.')
+    parser.add_argument('--categories', nargs='+', help='Category names to scrape (default: all)')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='Pages fetched concurrently')
+    parser.add_argument('--drivers', type=int, default=DRIVER_POOL_SIZE, help='Browser sessions kept for pages that need JavaScript')
+    parser.add_argument('--transport', choices=['auto', 'http', 'browser'], default=TRANSPORT,
+                        help='auto: plain HTTP with a browser fallback; http: never start a browser; browser: always render')
+    parser.add_argument('--rate', type=float, default=HOST_RATE, help='Requests per second allowed per host')
+    parser.add_argument('--max-pages', type=int, default=MAX_PAGES)
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PATH)
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start over')
+    parser.add_argument('--fixtures', nargs='?', const='', help='Scrape the local HTML fixtures instead of Amazon')
+    parser.add_argument('--fixtures-port', type=int, help='Port for the fixture server (default: 8800, keep it stable to resume)')
+    parser.add_argument('--output-dir', help=f'Where to write the product segments (default: {OUTPUT_DIR}, or a temporary directory with --fixtures)')
+    args = parser.parse_args()
+    
+    server = None
+    base_url = None
+    names = args.categories
+    output_dir = args.output_dir or OUTPUT_DIR
+    checkpoint_path = args.checkpoint
+    if args.fixtures is not None:
+        from fixture_server import FIXTURES_DIR, FIXTURES_PORT, serve_fixtures, fixture_keywords
+        fixtures_dir = args.fixtures or FIXTURES_DIR
+        server, base_url = serve_fixtures(fixtures_dir, port=args.fixtures_port or FIXTURES_PORT)
+        keywords = fixture_keywords(fixtures_dir)
+        names = [
+            category['name'] for category in categories
+            if parse_qs(urlparse(category['url']).query)['k'][0].replace(' ', '_') in keywords
+            and (not args.categories or category['name'] in args.categories)
+        ]
+        output_dir = args.output_dir or tempfile.mkdtemp(prefix='scrape-fixtures-')
+        if checkpoint_path == CHECKPOINT_PATH:
+            checkpoint_path = os.path.join(output_dir, '.scrape_checkpoint.json')
+        logger.info(f"Serving fixtures from {fixtures_dir} at {base_url}, writing to {output_dir}")
+    
+    os.makedirs(output_dir, exist_ok=True)
     
     with file_lock:
-        with open('amazon_data/categories.csv', 'w', newline='', encoding='utf-8') as f:
+        with open(os.path.join(output_dir, 'categories.csv'), 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['Category Name', 'URL'])
             for category in categories:
                 writer.writerow([category['name'], category['url']])
     
-    logger.info("Category list saved to amazon_data/categories.csv")
-    
-    category_queue = Queue()
+    logger.info(f"Category list saved to {os.path.join(output_dir, 'categories.csv')}")
     
-    for category in categories:
-        category_queue.put(category)
+    checkpoint = Checkpoint(checkpoint_path)
+    if args.restart:
+        checkpoint.clear()
     
-    num_threads = min(5, len(categories)) 
-    logger.info(f"Starting {num_threads} worker threads to process {len(categories)} categories")
+    selected = select_categories(names, base_url)
+    pool = DriverPool(size=args.drivers)
+    fetcher = PageFetcher(pool, HostRateLimiter(args.rate), args.transport)
+    scheduler = ScrapeScheduler(fetcher, checkpoint, output_dir, args.max_pages, args.workers)
+    logger.info(f"Scraping {len(selected)} categories with {args.workers} workers ({args.transport} transport) at {args.rate} requests/s per host")
     
-    threads = []
-    for i in range(num_threads):
-        thread = threading.Thread(
-            target=category_thread_worker, 
-            args=(category_queue,),
-            name=f"Thread-{i+1}"
-        )
-        thread.daemon = True
-        threads.append(thread)
-        thread.start()
-    
-    category_queue.join()
-    
-    logger.info("All categories have been processed. Scraping finished.")
+    try:
+        scheduler.run(selected)
+        checkpoint.clear()
+        logger.info("All categories have been processed. Scraping finished.")
+        logger.info(f"Fetched {fetcher.http_pages} pages over HTTP and {fetcher.browser_pages} with the browser")
+    except KeyboardInterrupt:
+        logger.warning(f"Interrupted, progress saved to {checkpoint_path}; run again to resume")
+    finally:
+        pool.close()
+        if server is not None:
+            server.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
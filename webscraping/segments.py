@@ -0,0 +1,141 @@
+import os
+import csv
+import time
+import uuid
+import argparse
+import tempfile
+from datetime import datetime, timezone
+
+PRODUCT_COLUMNS = [
+    'product_id', 'product_name', 'category', 'discounted_price', 'actual_price',
+    'discount_percentage', 'rating', 'rating_count', 'about_product', 'product_link'
+]
+SEGMENT_COLUMNS = PRODUCT_COLUMNS + ['scraped_at']
+SEGMENTS_DIR = 'segments'
+COMPACTED_SUFFIX = '.compacted.csv'
+
+
+def category_slug(category_name):
+    return category_name.lower().replace(' ', '_')
+
+
+def segment_dir(output_dir, category_name):
+    return os.path.join(output_dir, SEGMENTS_DIR, category_slug(category_name))
+
+
+def new_run_id():
+    return f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:6]}"
+
+
+def segment_key(filename):
+    return os.path.basename(filename).split('.', 1)[0]
+
+
+def list_segments(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.csv')),
+        key=segment_key
+    )
+
+
+def list_categories(output_dir):
+    root = os.path.join(output_dir, SEGMENTS_DIR)
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+
+
+def read_segment(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        yield from reader
+
+
+def latest_rows(paths):
+    latest = {}
+    product_index = SEGMENT_COLUMNS.index('product_id')
+    scraped_index = SEGMENT_COLUMNS.index('scraped_at')
+    for path in paths:
+        for row in read_segment(path):
+            current = latest.get(row[product_index])
+            if current is None or row[scraped_index] >= current[scraped_index]:
+                latest[row[product_index]] = row
+    return list(latest.values())
+
+
+def write_segment(path, rows):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False, newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(SEGMENT_COLUMNS)
+        writer.writerows(rows)
+    os.replace(f.name, path)
+
+
+class SegmentWriter:
+    def __init__(self, output_dir, category_name, run_id):
+        self.directory = segment_dir(output_dir, category_name)
+        self.run_id = run_id
+        self.written = set()
+        self.segments = 0
+        for path in list_segments(self.directory):
+            if segment_key(path).startswith(f'{run_id}-'):
+                self.segments += 1
+                self.written.update(row[0] for row in read_segment(path))
+
+    def append(self, products):
+        rows = []
+        scraped_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        for product in products:
+            product_id = product['product_id']
+            if product_id in self.written:
+                continue
+            self.written.add(product_id)
+            rows.append([
+                '' if product.get(column) is None else product[column] for column in PRODUCT_COLUMNS
+            ] + [product.get('scraped_at') or scraped_at])
+        if not rows:
+            return None
+
+        path = os.path.join(self.directory, f'{self.run_id}-{self.segments:05d}.csv')
+        write_segment(path, rows)
+        self.segments += 1
+        return path
+
+
+def compact(output_dir, category_slug_name):
+    directory = os.path.join(output_dir, SEGMENTS_DIR, category_slug_name)
+    paths = list_segments(directory)
+    if len(paths) < 2:
+        return None
+
+    rows = sorted(latest_rows(paths), key=lambda row: row[0])
+    target = os.path.join(directory, segment_key(paths[-1]) + COMPACTED_SUFFIX)
+    write_segment(target, rows)
+    for path in paths:
+        if path != target:
+            os.remove(path)
+    return target, len(paths), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact scraped product segments into one file per category, keeping the latest row per product_id.')
+    parser.add_argument('--output-dir', default='amazon_data')
+    parser.add_argument('--categories', nargs='+', help='Category directories to compact (default: all)')
+    args = parser.parse_args()
+
+    for name in args.categories or list_categories(args.output_dir):
+        result = compact(args.output_dir, category_slug(name))
+        if result is None:
+            print(f"[→] {name}: nothing to compact")
+            continue
+        target, merged, rows = result
+        print(f"[✓] {name}: {merged} segments compacted into {os.path.basename(target)} ({rows} products)")
+
+
+if __name__ == '__main__':
+    main()